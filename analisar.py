@@ -7,12 +7,32 @@ Uso:
     python3 analisar.py                    # Analisa todos os vídeos
     python3 analisar.py "video.mp4"        # Analisa um vídeo específico
     python3 analisar.py --intervalo 3      # Extrai frames a cada 3 segundos
+    python3 analisar.py --adaptativo       # Amostragem adaptativa (refina onde o texto muda)
+    python3 analisar.py --processos-ocr 4  # OCR em 4 processos paralelos
+    python3 analisar.py --ocr cascata      # Motor de OCR: easyocr, tesseract, onnx, cascata
+    python3 analisar.py --prefiltro        # Pula o OCR em frames sem texto (limiar opcional: --prefiltro 0.005)
+    python3 analisar.py --whisper small    # Modelo Whisper (tiny, base, small, medium, large)
+    python3 analisar.py --deadline 30      # Orçamento de 30s por vídeo (degrada para caber)
+    python3 analisar.py --paralelo 3       # Processa 3 vídeos ao mesmo tempo
+    python3 analisar.py --ordem curta      # Ordem: longa, curta, nome (padrão: auto)
+    python3 analisar.py --prioridade "video.mp4=2"  # Processa este vídeo antes dos outros
+    python3 analisar.py --observar         # Fica observando a pasta e processa vídeos novos
+    python3 analisar.py --banco            # Também grava no histórico SQLite (resultados/resultados.db)
+    python3 analisar.py --reaproveitar     # Reaproveita a análise de vídeos quase iguais já vistos (resultados/impressoes.db)
+    python3 analisar.py --lote-whisper 8   # Transcreve os áudios de 8 vídeos curtos em um lote do Whisper
+    python3 analisar.py --autoajuste       # Calibra esta máquina nos vídeos mais curtos e grava o perfil
+    python3 analisar.py --sem-perfil       # Ignora o perfil da máquina (perfis/<host>.json)
+
+Se existir um perfil da máquina (gerado por --autoajuste), os ajustes dele
+viram o padrão de --intervalo, --whisper e --processos-ocr.
 """
 
 import os
 import sys
 import glob
 import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
 from rich.console import Console
 from rich.panel import Panel
@@ -20,11 +40,15 @@ from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TimeEl
 from rich.table import Table
 from rich import box
 
-from tiktok_analyzer.video_processor import extract_frames, extract_audio
-from tiktok_analyzer.ocr_extractor import extract_text_from_frames, texts_to_string
-from tiktok_analyzer.audio_transcriber import transcribe_audio, cleanup_audio
-from tiktok_analyzer.context_analyzer import analyze_content
-from tiktok_analyzer.report_generator import generate_reports
+from tiktok_analyzer.pipeline import analyze_video, analyze_batch, make_config
+from tiktok_analyzer.report_generator import generate_reports, start_report_session, append_to_report_session
+from tiktok_analyzer.watcher import watch_folder
+from tiktok_analyzer.results_store import open_store, append_results, DEFAULT_DB_PATH
+from tiktok_analyzer.text_prefilter import DEFAULT_THRESHOLD
+from tiktok_analyzer.scheduler import probe_videos, order_jobs, estimated_makespan, STRATEGIES
+from tiktok_analyzer.fingerprint import DEFAULT_INDEX_PATH
+from tiktok_analyzer.model_cache import warm_up
+from tiktok_analyzer.autotune import load_profile, profile_path, run_autotune
 
 console = Console()
 
@@ -32,6 +56,9 @@ console = Console()
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(SCRIPT_DIR, "resultados")
 
+# Vídeos (os mais curtos) usados na calibração do --autoajuste
+AUTOTUNE_SAMPLES = 3
+
 
 def show_banner():
     """Mostra o banner do programa."""
@@ -83,56 +110,64 @@ def find_videos(specific_video: str = None) -> list:
     return unique_videos
 
 
-def process_single_video(video_path: str, frame_interval: float = 2.0) -> dict:
+def _video_config(frame_interval: float = 2.0, adaptive: bool = False, ocr_workers: int = 1,
+                  ocr_engine: str = 'easyocr', whisper_model: str = 'base', deadline: float = None,
+                  prefilter: float = None, fingerprint_index: str = None) -> dict:
+    """Monta a configuração da análise (mesmos argumentos de process_single_video)."""
+    return make_config(
+        frame_interval=frame_interval,
+        adaptive=adaptive,
+        ocr_workers=ocr_workers,
+        ocr_engine=ocr_engine,
+        whisper_model=whisper_model,
+        deadline=deadline,
+        prefilter=prefilter,
+        fingerprint_index=fingerprint_index,
+    )
+
+
+def _show_header(video_path: str):
+    """Mostra o cabeçalho de um vídeo."""
+    console.print(f"\n[bold cyan]{'─' * 60}[/bold cyan]")
+    console.print(f"[bold white]  📹 Processando: {os.path.basename(video_path)}[/bold white]")
+    console.print(f"[bold cyan]{'─' * 60}[/bold cyan]")
+
+
+def process_single_video(video_path: str, frame_interval: float = 2.0, adaptive: bool = False,
+                         ocr_workers: int = 1, ocr_engine: str = 'easyocr',
+                         whisper_model: str = 'base', deadline: float = None,
+                         prefilter: float = None, fingerprint_index: str = None,
+                         info: dict = None) -> dict:
     """
     Processa um único vídeo: extrai texto, transcreve áudio, gera hashtags.
     
     Args:
         video_path: Caminho completo do vídeo
         frame_interval: Intervalo entre frames para OCR (segundos)
+        adaptive: Usa amostragem adaptativa de frames em vez do intervalo fixo
+        ocr_workers: Número de processos OCR em paralelo
+        ocr_engine: Motor de OCR ('easyocr', 'tesseract', 'onnx', 'cascata')
+        whisper_model: Modelo Whisper ('tiny', 'base', 'small', 'medium', 'large')
+        deadline: Orçamento de tempo do vídeo em segundos (None = sem limite);
+                  ao estourar, aplica as degradações de latency_budget
+        prefilter: Limiar do pré-filtro de texto (None = OCR em todos os frames)
+        fingerprint_index: Índice de impressões para reaproveitar vídeos
+                           repetidos (None = sempre analisa)
+        info: Metadados já lidos pelo agendador (evita outro ffprobe)
     
     Returns:
         Dict com todos os resultados da análise
     """
-    video_name = os.path.basename(video_path)
+    _show_header(video_path)
     
-    console.print(f"\n[bold cyan]{'─' * 60}[/bold cyan]")
-    console.print(f"[bold white]  📹 Processando: {video_name}[/bold white]")
-    console.print(f"[bold cyan]{'─' * 60}[/bold cyan]")
+    config = _video_config(frame_interval, adaptive, ocr_workers, ocr_engine, whisper_model,
+                           deadline, prefilter, fingerprint_index)
+    
+    def show_stage(number: int, label: str):
+        prefix = "\n" if number == 1 else ""
+        console.print(f"{prefix}[dim]  Etapa {number}/4: {label}[/dim]")
     
-    # 1. Extrai frames para OCR
-    console.print("\n[dim]  Etapa 1/4: Extraindo frames...[/dim]")
-    frames = extract_frames(video_path, interval_seconds=frame_interval)
-    
-    # 2. OCR nos frames
-    console.print("[dim]  Etapa 2/4: Detectando texto (OCR)...[/dim]")
-    ocr_texts = extract_text_from_frames(frames)
-    ocr_text_combined = texts_to_string(ocr_texts)
-    
-    # Libera memória dos frames
-    del frames
-    
-    # 3. Extrai e transcreve áudio
-    console.print("[dim]  Etapa 3/4: Transcrevendo áudio...[/dim]")
-    audio_path = extract_audio(video_path)
-    transcription_result = transcribe_audio(audio_path)
-    cleanup_audio(audio_path)
-    
-    # 4. Analisa contexto e gera hashtags/descrição
-    console.print("[dim]  Etapa 4/4: Gerando hashtags e descrição...[/dim]")
-    analysis = analyze_content(ocr_texts, transcription_result)
-    
-    # Resultado completo
-    result = {
-        'video': video_name,
-        'ocr_text': ocr_text_combined,
-        'transcription': transcription_result.get('text', ''),
-        'language': transcription_result.get('language', 'unknown'),
-        'hashtags': analysis['hashtags'],
-        'description': analysis['description'],
-        'keywords': analysis['keywords'],
-        'categories': analysis['categories'],
-    }
+    result = analyze_video(video_path, config, on_stage=show_stage, info=info)
     
     # Mostra preview
     _show_preview(result)
@@ -140,6 +175,40 @@ def process_single_video(video_path: str, frame_interval: float = 2.0) -> dict:
     return result
 
 
+def process_video_batch(video_paths: list, *video_args, infos: dict = None) -> list:
+    """
+    Processa vários vídeos curtos com a transcrição em um único lote do Whisper.
+    
+    Args:
+        video_paths: Caminhos completos dos vídeos
+        video_args: Mesmos argumentos de process_single_video
+        infos: Metadados já lidos pelo agendador ({caminho: info})
+    
+    Returns:
+        Lista de resultados (vídeos que falharam viram {'video', 'error'})
+    """
+    config = _video_config(*video_args)
+    
+    def show_stage(video_path: str, number: int, label: str):
+        if number == 1:
+            _show_header(video_path)
+            console.print()
+        elif number == 3:
+            console.print(f"\n[bold white]  🧠 Lote de {len(video_paths)} vídeo(s)[/bold white]")
+        elif number == 4:
+            label = f"{label} ({os.path.basename(video_path)})"
+        console.print(f"[dim]  Etapa {number}/4: {label}[/dim]")
+    
+    results = analyze_batch(video_paths, config, on_stage=show_stage, infos=infos)
+    
+    for result in results:
+        if 'error' not in result:
+            console.print(f"\n[bold white]  📹 {result['video']}[/bold white]")
+            _show_preview(result)
+    
+    return results
+
+
 def _show_preview(result: dict):
     """Mostra preview dos resultados no terminal."""
     console.print()
@@ -156,9 +225,21 @@ def _show_preview(result: dict):
         cats = ", ".join([f"{cat}" for cat, _ in result['categories'][:3]])
         console.print(f"  [bold magenta]📂 Categorias:[/bold magenta] {cats}")
     
+    # Degradações aplicadas pelo orçamento de tempo
+    if result.get('degradations'):
+        console.print(f"  [bold yellow]⏱️ Degradações ({result['elapsed']}s):[/bold yellow] {', '.join(result['degradations'])}")
+    
     console.print()
 
 
+def _warm_worker(whisper_model: str, ocr_engine: str):
+    """Carrega e aquece os modelos (no processo principal ou ao subir cada worker paralelo)."""
+    try:
+        warm_up(whisper_model, ocr_engine)
+    except Exception as e:
+        console.print(f"[yellow]  ⚠️ Aquecimento dos modelos falhou: {e}[/yellow]")
+
+
 def show_summary(results: list):
     """Mostra tabela resumo no terminal."""
     table = Table(
@@ -191,6 +272,37 @@ def show_summary(results: list):
     console.print(table)
 
 
+def watch_mode(video_args: tuple, store=None):
+    """
+    Modo observação: processa cada vídeo novo da pasta assim que o upload
+    termina e acrescenta o resultado aos relatórios da sessão.
+    
+    Args:
+        video_args: Argumentos repassados para process_single_video
+        store: Conexão do histórico SQLite (opcional)
+    """
+    console.print(f"\n[bold white]  👀 Modo observação — aguardando vídeos novos (Ctrl+C para sair)[/bold white]")
+    session = start_report_session(OUTPUT_DIR)
+    
+    def on_video(video_path: str):
+        try:
+            result = process_single_video(video_path, *video_args)
+        except Exception as e:
+            console.print(f"[red]  ❌ Erro ao processar {os.path.basename(video_path)}: {e}[/red]")
+            return
+        append_to_report_session(session, result)
+        if store is not None:
+            append_results(store, [result])
+        console.print(f"[green]  ✅ {result['video']} adicionado aos relatórios[/green]")
+    
+    try:
+        watch_folder(SCRIPT_DIR, on_video)
+    except KeyboardInterrupt:
+        pass
+    
+    console.print(f"\n[bold green]  ✅ Observação encerrada: {len(session['results'])} vídeo(s) analisado(s)[/bold green]\n")
+
+
 def main():
     """Função principal."""
     show_banner()
@@ -198,13 +310,92 @@ def main():
     # Parse argumentos
     specific_video = None
     frame_interval = 2.0
+    adaptive = False
+    ocr_workers = 1
+    ocr_engine = 'easyocr'
+    whisper_model = 'base'
+    deadline = None
+    prefilter = None
+    video_workers = 1
+    order = 'auto'
+    priorities = {}
+    watch = False
+    use_store = False
+    autotune = False
+    fingerprint_index = None
+    whisper_batch = 1
     
     args = sys.argv[1:]
+    
+    # Perfil da máquina: vira o padrão, as opções da linha de comando têm prioridade
+    profile = None if '--sem-perfil' in args else load_profile()
+    if profile:
+        frame_interval = profile.get('frame_interval', frame_interval)
+        whisper_model = profile.get('whisper_model', whisper_model)
+        ocr_workers = profile.get('ocr_workers', ocr_workers)
+    
     i = 0
     while i < len(args):
         if args[i] == '--intervalo' and i + 1 < len(args):
             frame_interval = float(args[i + 1])
             i += 2
+        elif args[i] == '--processos-ocr' and i + 1 < len(args):
+            ocr_workers = max(1, int(args[i + 1]))
+            i += 2
+        elif args[i] == '--ocr' and i + 1 < len(args):
+            ocr_engine = args[i + 1]
+            i += 2
+        elif args[i] == '--whisper' and i + 1 < len(args):
+            whisper_model = args[i + 1]
+            i += 2
+        elif args[i] == '--deadline' and i + 1 < len(args):
+            deadline = float(args[i + 1])
+            i += 2
+        elif args[i] == '--paralelo' and i + 1 < len(args):
+            video_workers = max(1, int(args[i + 1]))
+            i += 2
+        elif args[i] == '--ordem' and i + 1 < len(args):
+            order = args[i + 1]
+            if order != 'auto' and order not in STRATEGIES:
+                console.print(f"[red]❌ Ordem desconhecida: {order} (use auto, {', '.join(STRATEGIES)})[/red]")
+                sys.exit(1)
+            i += 2
+        elif args[i] == '--prioridade' and i + 1 < len(args):
+            name, _, value = args[i + 1].rpartition('=')
+            priorities[name] = int(value)
+            i += 2
+        elif args[i] == '--lote-whisper' and i + 1 < len(args):
+            whisper_batch = max(1, int(args[i + 1]))
+            i += 2
+        elif args[i] == '--reaproveitar':
+            fingerprint_index = DEFAULT_INDEX_PATH
+            i += 1
+            if i < len(args) and args[i].endswith('.db'):
+                fingerprint_index = args[i]
+                i += 1
+        elif args[i] == '--autoajuste':
+            autotune = True
+            i += 1
+        elif args[i] == '--sem-perfil':
+            i += 1
+        elif args[i] == '--observar':
+            watch = True
+            i += 1
+        elif args[i] == '--banco':
+            use_store = True
+            i += 1
+        elif args[i] == '--prefiltro':
+            prefilter = DEFAULT_THRESHOLD
+            i += 1
+            if i < len(args):
+                try:
+                    prefilter = float(args[i])
+                    i += 1
+                except ValueError:
+                    pass
+        elif args[i] == '--adaptativo':
+            adaptive = True
+            i += 1
         elif args[i] == '--help' or args[i] == '-h':
             console.print(__doc__)
             sys.exit(0)
@@ -212,6 +403,25 @@ def main():
             specific_video = args[i]
             i += 1
     
+    video_args = (frame_interval, adaptive, ocr_workers, ocr_engine, whisper_model, deadline, prefilter,
+                  fingerprint_index)
+    
+    store = open_store() if use_store else None
+    
+    # Modelos carregados e aquecidos antes do primeiro vídeo (o OCR só se for
+    # no próprio processo; com --processos-ocr ele roda no pool de OCR)
+    warm_args = (whisper_model, ocr_engine if ocr_workers == 1 else None)
+    
+    if watch:
+        # O modo observação processa um vídeo por vez, assim que cada upload termina
+        ignored = [flag for flag, value in (('--paralelo', video_workers), ('--lote-whisper', whisper_batch))
+                   if value > 1]
+        if ignored:
+            console.print(f"[yellow]  ⚠️ {', '.join(ignored)} não se aplica ao modo observação (ignorado)[/yellow]")
+        _warm_worker(*warm_args)
+        watch_mode(video_args, store)
+        return
+    
     # Encontra vídeos
     videos = find_videos(specific_video)
     
@@ -219,23 +429,108 @@ def main():
         console.print("[red]❌ Nenhum vídeo MP4 encontrado nesta pasta![/red]")
         sys.exit(1)
     
+    if autotune:
+        samples = order_jobs(probe_videos(videos), 'curta')[:AUTOTUNE_SAMPLES]
+        run_autotune([job['path'] for job in samples], {'ocr_engine': ocr_engine, 'prefilter': prefilter})
+        return
+    
     console.print(f"\n[bold white]  📹 {len(videos)} vídeo(s) encontrado(s)[/bold white]")
-    console.print(f"[dim]  ⏱️ Intervalo de frames: {frame_interval}s[/dim]")
+    if profile:
+        console.print(f"[dim]  ⚙️ Perfil da máquina: {os.path.relpath(profile_path(), SCRIPT_DIR)}[/dim]")
+    if adaptive:
+        console.print("[dim]  ⏱️ Intervalo de frames: adaptativo[/dim]")
+    else:
+        console.print(f"[dim]  ⏱️ Intervalo de frames: {frame_interval}s[/dim]")
+    console.print(f"[dim]  🔤 Motor de OCR: {ocr_engine}[/dim]")
+    if prefilter is not None:
+        console.print(f"[dim]  ⏭️ Pré-filtro de texto: limiar {prefilter:g}[/dim]")
+    if ocr_workers > 1:
+        console.print(f"[dim]  🔤 Processos OCR: {ocr_workers}[/dim]")
+    console.print(f"[dim]  🧠 Modelo Whisper: {whisper_model}[/dim]")
+    if whisper_batch > 1:
+        console.print(f"[dim]  🧠 Lotes de transcrição: {whisper_batch} vídeos[/dim]")
+    if deadline:
+        console.print(f"[dim]  ⏱️ Orçamento por vídeo: {deadline:g}s[/dim]")
+    if fingerprint_index:
+        console.print(f"[dim]  ♻️ Reaproveitamento: {os.path.basename(fingerprint_index)}[/dim]")
     console.print(f"[dim]  📁 Output: {OUTPUT_DIR}/[/dim]\n")
     
-    # Processa cada vídeo
+    # Ordena os vídeos pelos metadados do contêiner (duração, resolução, áudio)
+    if order == 'auto':
+        order = 'longa' if video_workers > 1 else 'curta'
+    jobs = order_jobs(probe_videos(videos), order, priorities)
+    if video_workers > 1:
+        console.print(f"[dim]  📋 Ordem: {order} — {video_workers} workers "
+                      f"(carga estimada do mais ocupado: {estimated_makespan(jobs, video_workers):.0f})[/dim]\n")
+    else:
+        console.print(f"[dim]  📋 Ordem: {order}[/dim]\n")
+    
+    # Processa cada vídeo (o ffprobe do agendador é reaproveitado na ingestão)
     results = []
     start_time = time.time()
-    
-    for idx, video_path in enumerate(videos, 1):
-        console.print(f"\n[bold yellow]  ⏳ Vídeo {idx}/{len(videos)}[/bold yellow]")
+    infos = {job['path']: job['info'] for job in jobs}
+    
+    if whisper_batch > 1:
+        # Lotes de vídeos: ingestão e OCR um a um, transcrição do lote de uma vez
+        chunks = [[job['path'] for job in jobs[i:i + whisper_batch]]
+                  for i in range(0, len(jobs), whisper_batch)]
+        batches = {}
+        if video_workers > 1:
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=video_workers, mp_context=ctx,
+                                     initializer=_warm_worker, initargs=warm_args) as executor:
+                futures = {executor.submit(process_video_batch, chunk, *video_args,
+                                           infos={path: infos[path] for path in chunk}): idx
+                           for idx, chunk in enumerate(chunks)}
+                for future in as_completed(futures):
+                    try:
+                        batches[futures[future]] = future.result()
+                    except Exception as e:
+                        console.print(f"[red]  ❌ Erro ao processar um lote de {len(chunks[futures[future]])} vídeo(s): {e}[/red]")
+        else:
+            _warm_worker(*warm_args)
+            for idx, chunk in enumerate(chunks, 1):
+                console.print(f"\n[bold yellow]  ⏳ Lote {idx}/{len(chunks)}[/bold yellow]")
+                try:
+                    batches[idx] = process_video_batch(chunk, *video_args,
+                                                       infos={path: infos[path] for path in chunk})
+                except Exception as e:
+                    console.print(f"[red]  ❌ Erro ao processar o lote {idx}: {e}[/red]")
         
-        try:
-            result = process_single_video(video_path, frame_interval)
-            results.append(result)
-        except Exception as e:
-            console.print(f"[red]  ❌ Erro ao processar {os.path.basename(video_path)}: {e}[/red]")
-            continue
+        # Na ordem agendada, não na ordem em que os lotes terminaram
+        for _, batch in sorted(batches.items()):
+            for result in batch:
+                if 'error' in result:
+                    console.print(f"[red]  ❌ Erro ao processar {result['video']}: {result['error']}[/red]")
+                else:
+                    results.append(result)
+    elif video_workers > 1:
+        # Fila única: cada worker livre pega o próximo vídeo da ordem agendada
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=video_workers, mp_context=ctx,
+                                 initializer=_warm_worker, initargs=warm_args) as executor:
+            futures = {executor.submit(process_single_video, job['path'], *video_args, info=job['info']): idx
+                       for idx, job in enumerate(jobs)}
+            finished = {}
+            for future in as_completed(futures):
+                try:
+                    finished[futures[future]] = future.result()
+                except Exception as e:
+                    console.print(f"[red]  ❌ Erro ao processar {os.path.basename(jobs[futures[future]]['path'])}: {e}[/red]")
+        # Na ordem agendada, não na ordem em que os vídeos terminaram
+        results = [result for _, result in sorted(finished.items())]
+    else:
+        _warm_worker(*warm_args)
+        for idx, job in enumerate(jobs, 1):
+            video_path = job['path']
+            console.print(f"\n[bold yellow]  ⏳ Vídeo {idx}/{len(jobs)}[/bold yellow]")
+            
+            try:
+                result = process_single_video(video_path, *video_args, info=job['info'])
+                results.append(result)
+            except Exception as e:
+                console.print(f"[red]  ❌ Erro ao processar {os.path.basename(video_path)}: {e}[/red]")
+                continue
     
     elapsed = time.time() - start_time
     
@@ -249,6 +544,9 @@ def main():
     # Gera relatórios
     console.print(f"\n[bold white]  💾 Salvando relatórios...[/bold white]")
     report_paths = generate_reports(results, OUTPUT_DIR)
+    if store is not None:
+        append_results(store, results)
+        console.print(f"   🗄️ {len(results)} vídeo(s) adicionados ao histórico ({os.path.basename(DEFAULT_DB_PATH)})")
     
     # Finalização
     console.print(f"\n[bold green]{'═' * 60}[/bold green]")
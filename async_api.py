@@ -0,0 +1,178 @@
+"""
+API assíncrona para embutir o analisador em serviços asyncio.
+
+Uso:
+    from tiktok_analyzer.async_api import analyze_videos
+
+    async for result in analyze_videos(paths, {'whisper_model': 'tiny', 'timeout': 60}):
+        ...
+
+As etapas bloqueantes rodam em executores separados: decodificação em um
+pool de threads do tamanho da concorrência, e OCR e Whisper em uma thread
+cada (os modelos são carregados uma vez só e usam vários núcleos
+internamente). Nada é impresso no console e os resultados são os mesmos
+dicts da CLI.
+"""
+
+import os
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from tiktok_analyzer.pipeline import (
+    make_config, set_quiet, start_video,
+    ingest_stage, ocr_stage, transcription_stage, analysis_stage,
+)
+
+# Opções da API, além das de pipeline.DEFAULT_CONFIG
+API_DEFAULTS = {
+    'max_concurrency': 2,  # vídeos em andamento ao mesmo tempo
+    'max_pending': None,   # resultados prontos aguardando consumo (padrão: max_concurrency)
+    'timeout': None,       # tempo máximo por vídeo (segundos)
+    'quiet': True,         # silencia as mensagens de console dos módulos
+}
+
+_DONE = object()
+
+
+def _create_executors(max_concurrency: int) -> dict:
+    """Cria os executores de cada tipo de etapa."""
+    return {
+        'decode': ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='decode'),
+        'ocr': ThreadPoolExecutor(max_workers=1, thread_name_prefix='ocr'),
+        'whisper': ThreadPoolExecutor(max_workers=1, thread_name_prefix='whisper'),
+    }
+
+
+async def _iterate(paths):
+    """Percorre caminhos vindos de um iterável comum ou assíncrono."""
+    if hasattr(paths, '__aiter__'):
+        async for path in paths:
+            yield path
+    else:
+        for path in paths:
+            yield path
+
+
+async def analyze_video(video_path: str, config: dict, executors: dict) -> dict:
+    """
+    Analisa um vídeo, cada etapa no seu executor.
+
+    Se a tarefa for cancelada (ou estourar o timeout), o estado do vídeo é
+    marcado como cancelado: o OCR em execução para no próximo frame e as
+    etapas já enfileiradas desistem ao começar, liberando os executores
+    para os vídeos seguintes (a transcrição para na próxima janela de 30 s).
+
+    Returns:
+        Dict com todos os resultados da análise
+    """
+    loop = asyncio.get_running_loop()
+    state = start_video(video_path, config)
+
+    try:
+        await loop.run_in_executor(executors['decode'], ingest_stage, state)
+        await loop.run_in_executor(executors['ocr'], ocr_stage, state)
+        await loop.run_in_executor(executors['whisper'], transcription_stage, state)
+        return await loop.run_in_executor(executors['decode'], analysis_stage, state)
+    except asyncio.CancelledError:
+        state['cancel'].set()
+        raise
+
+
+async def analyze_videos(paths, config: dict = None):
+    """
+    Analisa vários vídeos com concorrência limitada, entregando cada
+    resultado assim que fica pronto (não necessariamente na ordem de entrada).
+
+    Backpressure: no máximo `max_concurrency` vídeos ficam em andamento e no
+    máximo `max_pending` resultados esperam o consumidor; enquanto o
+    consumidor não lê, nenhum vídeo novo é iniciado. Fechar ou cancelar o
+    iterador cancela os vídeos em andamento.
+
+    Args:
+        paths: Caminhos dos vídeos (iterável comum ou assíncrono)
+        config: Opções de pipeline.DEFAULT_CONFIG e de API_DEFAULTS
+
+    Yields:
+        Dict de resultado por vídeo (com 'path'); em caso de falha ou
+        timeout, {'video', 'path', 'error'}
+
+    Raises:
+        A exceção do iterador de caminhos, se ele falhar (os vídeos em
+        andamento são cancelados)
+    """
+    options = dict(API_DEFAULTS)
+    options.update(config or {})
+    pipeline_config = make_config({k: v for k, v in options.items() if k not in API_DEFAULTS})
+
+    max_concurrency = max(1, options['max_concurrency'])
+    max_pending = options['max_pending'] or max_concurrency
+    timeout = options['timeout']
+
+    if options['quiet']:
+        set_quiet(True)
+
+    executors = _create_executors(max_concurrency)
+    results = asyncio.Queue(maxsize=max_pending)
+    source = _iterate(paths)
+    source_lock = asyncio.Lock()
+
+    async def next_path():
+        async with source_lock:
+            try:
+                return await source.__anext__()
+            except StopAsyncIteration:
+                return None
+
+    async def worker():
+        error = None
+        cancelled = False
+        try:
+            while True:
+                path = await next_path()
+                if path is None:
+                    break
+
+                try:
+                    result = await asyncio.wait_for(
+                        analyze_video(path, pipeline_config, executors), timeout
+                    )
+                except asyncio.TimeoutError:
+                    result = {'video': os.path.basename(path), 'error': f"timeout ({timeout:g}s)"}
+                except Exception as e:
+                    result = {'video': os.path.basename(path), 'error': str(e)}
+
+                result['path'] = path
+                # Espera o consumidor se a fila estiver cheia (backpressure)
+                await results.put(result)
+        except asyncio.CancelledError:
+            # Cancelado pelo consumidor, que já não espera o fim
+            cancelled = True
+            raise
+        except Exception as e:
+            # Falha do iterador de caminhos: repassa ao consumidor
+            error = e
+        finally:
+            # Sempre avisa o fim (ou o erro), para o consumidor não esperar para sempre
+            if not cancelled:
+                await results.put(error if error is not None else _DONE)
+
+    workers = [asyncio.create_task(worker()) for _ in range(max_concurrency)]
+    finished = 0
+
+    try:
+        while finished < len(workers):
+            item = await results.get()
+            if item is _DONE:
+                finished += 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for executor in executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        if options['quiet']:
+            set_quiet(False)
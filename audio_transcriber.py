@@ -1,40 +1,73 @@
 """
 Módulo de transcrição de áudio.
-Usa OpenAI Whisper para transcrever a fala dos vídeos.
+Usa OpenAI Whisper para transcrever a fala dos vídeos, um por vez
+(transcribe_audio) ou vários clipes curtos em lote (transcribe_batch).
+
+Comparação de vazão (um por vez x em lote):
+    python3 -m tiktok_analyzer.audio_transcriber video1.mp4 video2.mp4 ... [--whisper base] [--lote 8]
 """
 
 import os
+import sys
+import time
+import torch
 import whisper
 from rich.console import Console
 
+from tiktok_analyzer.model_cache import load_whisper
+
 console = Console()
 
-# Modelo Whisper (singleton)
-_model = None
+# Modelos Whisper carregados (um por nome)
+_models = {}
+
+# Janelas de 30 s decodificadas juntas em cada chamada do transcribe_batch
+DEFAULT_BATCH_SIZE = 8
+
+# Clipes mais longos que isso vão para o transcribe_audio: o lote decodifica
+# cada janela isolada (sem contexto nem timestamps), o que só compensa em
+# clipes curtos
+BATCH_MAX_SECONDS = 60
+
+# Mesmos critérios do model.transcribe: janelas que parecem ruins são
+# decodificadas de novo com temperatura maior, a menos que sejam silêncio
+TEMPERATURE_FALLBACK = (0.2, 0.4, 0.6, 0.8, 1.0)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
 
 
 def _get_model(model_name: str = "base"):
-    """Carrega o modelo Whisper (inicializa na primeira chamada)."""
-    global _model
-    if _model is None:
-        console.print(f"  🧠 Carregando modelo Whisper '{model_name}' (primeira vez pode demorar)...")
-        _model = whisper.load_model(model_name)
-    return _model
+    """Carrega o modelo Whisper (inicializa na primeira chamada; usa o cache preparado se houver)."""
+    if model_name not in _models:
+        model = load_whisper(model_name)
+        if model is None:
+            console.print(f"  🧠 Carregando modelo Whisper '{model_name}' (primeira vez pode demorar)...")
+            model = whisper.load_model(model_name)
+        _models[model_name] = model
+    return _models[model_name]
+
 
+class TranscriptionCancelled(Exception):
+    """A transcrição foi cancelada entre duas janelas de 30 s."""
 
-def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
+
+def transcribe_audio(audio, model_name: str = "base", cancel=None) -> dict:
     """
-    Transcreve um arquivo de áudio usando Whisper.
+    Transcreve um áudio usando Whisper.
     
     Args:
-        audio_path: Caminho do arquivo de áudio WAV
+        audio: Caminho do arquivo de áudio WAV, ou array float32 mono 16kHz
+               (como o retornado por demux_video)
         model_name: Nome do modelo Whisper ('tiny', 'base', 'small', 'medium', 'large')
+        cancel: threading.Event; quando acionado, a transcrição para antes
+                da próxima janela de 30 s e o resultado sai vazio
     
     Returns:
         Dict com 'text' (transcrição completa), 'language' (idioma detectado),
         'segments' (segmentos com timestamps)
     """
-    if audio_path is None or not os.path.exists(audio_path):
+    if audio is None or (isinstance(audio, str) and not os.path.exists(audio)) or len(audio) == 0:
         console.print("  [yellow]⚠️ Arquivo de áudio não encontrado[/yellow]")
         return {
             "text": "",
@@ -42,11 +75,23 @@ def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
             "segments": []
         }
     
+    model = None
     try:
         model = _get_model(model_name)
         
+        if cancel is not None:
+            # model.transcribe chama model.decode a cada janela: verifica ali
+            decode = model.decode
+            
+            def checked_decode(*args, **kwargs):
+                if cancel.is_set():
+                    raise TranscriptionCancelled()
+                return decode(*args, **kwargs)
+            
+            model.decode = checked_decode
+        
         result = model.transcribe(
-            audio_path,
+            audio,
             fp16=False,  # CPU-friendly
             verbose=False
         )
@@ -64,6 +109,14 @@ def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
             "segments": segments
         }
     
+    except TranscriptionCancelled:
+        console.print("  [yellow]⏹️ Transcrição cancelada[/yellow]")
+        return {
+            "text": "",
+            "language": "unknown",
+            "segments": []
+        }
+    
     except Exception as e:
         console.print(f"  [red]❌ Erro na transcrição: {e}[/red]")
         return {
@@ -71,6 +124,150 @@ def transcribe_audio(audio_path: str, model_name: str = "base") -> dict:
             "language": "unknown",
             "segments": []
         }
+    
+    finally:
+        if cancel is not None and model is not None:
+            model.__dict__.pop('decode', None)
+
+
+def _decode_windows(model, windows: list, language: str, batch_size: int) -> list:
+    """
+    Decodifica janelas de mel em lotes, com o fallback de temperatura do transcribe.
+
+    Args:
+        model: Modelo Whisper
+        windows: Mels (n_mels x 3000) das janelas
+        language: Idioma das janelas (None = detecta em cada uma)
+        batch_size: Janelas por chamada do decoder
+
+    Returns:
+        Lista de DecodingResult, na ordem das janelas
+    """
+    results = [None] * len(windows)
+    pending = list(range(len(windows)))
+
+    for temperature in (0.0,) + TEMPERATURE_FALLBACK:
+        if not pending:
+            break
+
+        options = whisper.DecodingOptions(
+            language=language, temperature=temperature, without_timestamps=True, fp16=False
+        )
+        retry = []
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            mel = torch.stack([windows[i] for i in chunk]).to(model.device)
+            for i, decoded in zip(chunk, whisper.decode(model, mel, options)):
+                results[i] = decoded
+                bad = (decoded.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+                       or decoded.avg_logprob < LOGPROB_THRESHOLD)
+                if bad and decoded.no_speech_prob <= NO_SPEECH_THRESHOLD:
+                    retry.append(i)
+        pending = retry
+
+    return results
+
+
+def transcribe_batch(audios: list, model_name: str = "base", batch_size: int = DEFAULT_BATCH_SIZE) -> list:
+    """
+    Transcreve vários clipes curtos decodificando as janelas de 30 s juntas.
+
+    O idioma de cada clipe é detectado na primeira janela (todas as
+    primeiras janelas vão no mesmo lote); as janelas seguintes são
+    agrupadas por idioma. Cada janela vira um segmento. Clipes com mais de
+    BATCH_MAX_SECONDS são transcritos um por vez com transcribe_audio.
+
+    Args:
+        audios: Áudios (caminhos WAV ou arrays float32 mono 16kHz)
+        model_name: Nome do modelo Whisper
+        batch_size: Janelas por chamada do decoder
+
+    Returns:
+        Lista de dicts como os de transcribe_audio, na ordem dos áudios
+    """
+    results = [{"text": "", "language": "unknown", "segments": []} for _ in audios]
+
+    clips = []
+    for i, audio in enumerate(audios):
+        if isinstance(audio, str):
+            audio = whisper.load_audio(audio) if os.path.exists(audio) else None
+        if audio is None or len(audio) == 0:
+            continue
+        if len(audio) > BATCH_MAX_SECONDS * whisper.audio.SAMPLE_RATE:
+            results[i] = transcribe_audio(audio, model_name)
+        else:
+            clips.append((i, audio))
+
+    if not clips:
+        return results
+
+    try:
+        model = _get_model(model_name)
+        n_mels = getattr(model.dims, 'n_mels', 80)
+        window = whisper.audio.N_SAMPLES
+
+        windows = {
+            i: [whisper.log_mel_spectrogram(whisper.pad_or_trim(audio[start:start + window]), n_mels)
+                for start in range(0, len(audio), window)]
+            for i, audio in clips
+        }
+
+        # Primeiras janelas: o decoder detecta o idioma de cada uma no mesmo lote
+        # (modelos só em inglês, como 'base.en', não detectam idioma)
+        firsts = [i for i, _ in clips]
+        first_language = None if model.is_multilingual else "en"
+        first_results = _decode_windows(model, [windows[i][0] for i in firsts], first_language, batch_size)
+        decoded = {i: [result] for i, result in zip(firsts, first_results)}
+        languages = {i: decoded[i][0].language for i in firsts}
+
+        # Demais janelas, agrupadas pelo idioma do clipe
+        by_language = {}
+        for i in firsts:
+            for w in range(1, len(windows[i])):
+                by_language.setdefault(languages[i], []).append((i, w))
+
+        for language, keys in by_language.items():
+            rest = _decode_windows(model, [windows[i][w] for i, w in keys], language, batch_size)
+            for (i, _), result in zip(keys, rest):
+                decoded[i].append(result)
+
+        for i, audio in clips:
+            duration = len(audio) / whisper.audio.SAMPLE_RATE
+            segments = []
+            for w, result in enumerate(decoded[i]):
+                # Silêncio, pelo mesmo critério do transcribe
+                if result.no_speech_prob > NO_SPEECH_THRESHOLD and result.avg_logprob < LOGPROB_THRESHOLD:
+                    continue
+                text = result.text.strip()
+                if not text:
+                    continue
+                segments.append({
+                    "id": len(segments),
+                    "start": w * 30.0,
+                    "end": min((w + 1) * 30.0, duration),
+                    "text": text,
+                    "temperature": result.temperature,
+                    "avg_logprob": result.avg_logprob,
+                    "compression_ratio": result.compression_ratio,
+                    "no_speech_prob": result.no_speech_prob,
+                })
+
+            results[i] = {
+                "text": " ".join(segment["text"] for segment in segments),
+                "language": languages[i],
+                "segments": segments,
+            }
+
+    except Exception as e:
+        # Uma falha no lote não deve apagar a transcrição de todos os vídeos
+        console.print(f"  [yellow]⚠️ Erro na transcrição em lote ({e}), transcrevendo um por vez[/yellow]")
+        for i, audio in clips:
+            results[i] = transcribe_audio(audio, model_name)
+        return results
+
+    n_windows = sum(len(w) for w in windows.values())
+    console.print(f"  📝 Transcrição em lote: {len(clips)} áudio(s), {n_windows} janela(s) de 30s")
+    return results
 
 
 def cleanup_audio(audio_path: str):
@@ -80,3 +277,64 @@ def cleanup_audio(audio_path: str):
             os.remove(audio_path)
     except Exception:
         pass
+
+
+def main():
+    """Compara a vazão da transcrição um por vez e em lote nos vídeos da linha de comando."""
+    from tiktok_analyzer.video_processor import demux_video, AUDIO_SAMPLE_RATE
+
+    args = sys.argv[1:]
+    model_name = "base"
+    batch_size = DEFAULT_BATCH_SIZE
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--whisper' and i + 1 < len(args):
+            model_name = args[i + 1]
+            i += 2
+        elif args[i] == '--lote' and i + 1 < len(args):
+            batch_size = max(1, int(args[i + 1]))
+            i += 2
+        else:
+            paths.append(args[i])
+            i += 1
+
+    if not paths:
+        console.print(__doc__)
+        sys.exit(1)
+
+    audios = []
+    for path in paths:
+        ingest = demux_video(path, include_video=False)
+        if ingest is not None and ingest['audio'] is not None:
+            audios.append(ingest['audio'])
+    audio_seconds = sum(len(audio) for audio in audios) / AUDIO_SAMPLE_RATE
+
+    if not audio_seconds:
+        console.print("  [red]❌ Nenhum dos vídeos tem áudio para transcrever[/red]")
+        sys.exit(1)
+
+    console.quiet = True
+    _get_model(model_name)
+
+    start = time.monotonic()
+    for audio in audios:
+        transcribe_audio(audio, model_name)
+    sequential = time.monotonic() - start
+
+    start = time.monotonic()
+    transcribe_batch(audios, model_name, batch_size)
+    batched = time.monotonic() - start
+    console.quiet = False
+
+    console.print(f"  🎧 {len(audios)} áudio(s), {audio_seconds:.0f}s no total (modelo {model_name})")
+    # Relógio pode marcar 0 em clipes minúsculos
+    sequential = max(sequential, 1e-6)
+    batched = max(batched, 1e-6)
+    console.print(f"  🐢 Um por vez: {audio_seconds / sequential:.1f}s de áudio por segundo")
+    console.print(f"  🚀 Em lote ({batch_size}): {audio_seconds / batched:.1f}s de áudio por segundo "
+                  f"({sequential / batched:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
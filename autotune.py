@@ -0,0 +1,313 @@
+"""
+Autoajuste por máquina.
+Roda uma calibração curta em vídeos de amostra: primeiro com a configuração
+de referência (a mais fiel), depois variando um ajuste de cada vez
+(processos OCR, intervalo de frames e modelo Whisper). Mede a
+vazão (segundos de vídeo por segundo de processamento) e o quanto o
+resultado se afasta da referência, e grava no perfil da máquina os ajustes
+mais rápidos que ficam dentro da tolerância de qualidade.
+
+O perfil (perfis/<host>.json) é carregado automaticamente pelo analisar.py;
+opções passadas na linha de comando têm prioridade sobre ele.
+
+Uso:
+    python3 -m tiktok_analyzer.autotune video1.mp4 video2.mp4 [--tolerancia 0.85] [--ocr tesseract]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import socket
+from datetime import datetime
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+from tiktok_analyzer.pipeline import analyze_video, make_config, set_quiet
+from tiktok_analyzer.video_processor import probe_video
+
+console = Console()
+
+PROFILE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "perfis")
+
+# Ajustes que o perfil define (chaves de pipeline.DEFAULT_CONFIG)
+TUNED_KEYS = ('frame_interval', 'whisper_model', 'ocr_workers')
+
+# Configuração de referência: a mais fiel que ainda cabe em CPU
+REFERENCE_CONFIG = {
+    'frame_interval': 1.0,
+    'whisper_model': 'small',
+    'ocr_workers': 1,
+}
+
+# Similaridade mínima com a referência para aceitar um ajuste
+DEFAULT_TOLERANCE = 0.85
+
+# Peso de cada parte do resultado na similaridade
+SIMILARITY_WEIGHTS = {
+    'hashtags': 0.5,
+    'ocr_text': 0.25,
+    'transcription': 0.25,
+}
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def default_candidates() -> dict:
+    """
+    Valores testados para cada ajuste, na ordem em que são calibrados.
+
+    O ajuste que só muda a velocidade (processos OCR) vem primeiro; os que
+    trocam qualidade por tempo vêm depois.
+    """
+    cpus = os.cpu_count() or 1
+    return {
+        'ocr_workers': sorted({n for n in (1, 2, 4, cpus) if n <= cpus}),
+        'frame_interval': [1.0, 2.0, 3.0, 4.0],
+        'whisper_model': ['small', 'base', 'tiny'],
+    }
+
+
+def _words(text: str) -> set:
+    return set(_WORD_RE.findall(text.lower()))
+
+
+def _jaccard(a: set, b: set) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def similarity(result: dict, reference: dict) -> float:
+    """
+    Compara o resultado de um vídeo com o da referência.
+
+    Returns:
+        Similaridade de 0 a 1 (média ponderada do Jaccard das hashtags e das
+        palavras do OCR e da transcrição)
+    """
+    parts = {
+        'hashtags': _jaccard(set(result['hashtags']), set(reference['hashtags'])),
+        'ocr_text': _jaccard(_words(result['ocr_text']), _words(reference['ocr_text'])),
+        'transcription': _jaccard(_words(result['transcription']), _words(reference['transcription'])),
+    }
+    return sum(SIMILARITY_WEIGHTS[key] * value for key, value in parts.items())
+
+
+def _run(samples: list, config: dict) -> tuple:
+    """
+    Analisa as amostras com uma configuração.
+
+    A primeira amostra roda uma vez antes da medição para carregar os
+    modelos e o pool de OCR, que ficam em cache no processo.
+
+    Returns:
+        Tupla (vazão em segundos de vídeo por segundo, resultados por amostra)
+    """
+    analyze_video(samples[0]['path'], config, info=samples[0]['info'])
+
+    start = time.monotonic()
+    results = [analyze_video(sample['path'], config, info=sample['info']) for sample in samples]
+    elapsed = time.monotonic() - start
+
+    total_duration = sum(sample['duration'] for sample in samples)
+    return total_duration / max(elapsed, 1e-6), results
+
+
+def calibrate(paths: list, base_config: dict = None, tolerance: float = DEFAULT_TOLERANCE,
+              candidates: dict = None) -> dict:
+    """
+    Calibra os ajustes da máquina nos vídeos de amostra.
+
+    Cada ajuste é testado com os demais fixos nos melhores valores já
+    encontrados; um valor é adotado se aumentar a vazão sem deixar a
+    similaridade com a referência abaixo da tolerância.
+
+    Args:
+        paths: Caminhos dos vídeos de amostra (de preferência curtos)
+        base_config: Opções fixas da análise (motor de OCR, pré-filtro...)
+        tolerance: Similaridade mínima com a referência (0-1)
+        candidates: Valores a testar por ajuste (padrão: default_candidates)
+
+    Returns:
+        Dict com 'config' (ajustes escolhidos), 'throughput', 'similarity',
+        'reference_throughput' e 'trials' (todas as medições)
+    """
+    base = make_config(base_config, deadline=None)
+    candidates = candidates or default_candidates()
+
+    samples = []
+    for path in paths:
+        info = probe_video(path)
+        if info is not None and info['duration'] > 0:
+            samples.append({'path': path, 'duration': info['duration'], 'info': info})
+    if not samples:
+        raise ValueError("Nenhum vídeo de amostra válido")
+
+    current = {key: REFERENCE_CONFIG[key] for key in TUNED_KEYS}
+    trials = []
+
+    def measure(tuned: dict) -> tuple:
+        return _run(samples, make_config(base, **tuned))
+
+    set_quiet(True)
+    try:
+        console.print("  📏 Medindo a configuração de referência...")
+        reference_throughput, reference = measure(current)
+        trials.append({'config': dict(current), 'throughput': reference_throughput,
+                       'similarity': 1.0, 'accepted': True})
+        best_throughput = reference_throughput
+        best_similarity = 1.0
+
+        for key, values in candidates.items():
+            for value in values:
+                if value == current[key]:
+                    continue
+
+                tuned = dict(current, **{key: value})
+                console.print(f"  🔧 Testando {key} = {value}...")
+                throughput, results = measure(tuned)
+                score = min(similarity(r, ref) for r, ref in zip(results, reference))
+
+                accepted = score >= tolerance and throughput > best_throughput
+                trials.append({'config': tuned, 'throughput': throughput,
+                               'similarity': score, 'accepted': accepted})
+                if accepted:
+                    current = tuned
+                    best_throughput = throughput
+                    best_similarity = score
+    finally:
+        set_quiet(False)
+
+    return {
+        'config': current,
+        'throughput': best_throughput,
+        'similarity': best_similarity,
+        'reference_throughput': reference_throughput,
+        'trials': trials,
+    }
+
+
+def profile_path(host: str = None) -> str:
+    """Caminho do perfil da máquina (perfis/<host>.json)."""
+    return os.path.join(PROFILE_DIR, f"{host or socket.gethostname()}.json")
+
+
+def save_profile(calibration: dict, base_config: dict = None, tolerance: float = DEFAULT_TOLERANCE,
+                 path: str = None) -> str:
+    """
+    Grava o perfil da máquina com o resultado da calibração.
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    path = path or profile_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    profile = {
+        'host': socket.gethostname(),
+        'created_at': datetime.now().isoformat(),
+        'cpu_count': os.cpu_count(),
+        'ocr_engine': make_config(base_config)['ocr_engine'],
+        'tolerance': tolerance,
+        'config': calibration['config'],
+        'throughput': round(calibration['throughput'], 3),
+        'reference_throughput': round(calibration['reference_throughput'], 3),
+        'similarity': round(calibration['similarity'], 3),
+    }
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False, indent=2)
+
+    return path
+
+
+def load_profile(path: str = None) -> dict:
+    """
+    Carrega os ajustes do perfil da máquina.
+
+    Returns:
+        Dict só com as chaves de TUNED_KEYS, ou None se não houver perfil
+    """
+    path = path or profile_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    config = profile.get('config') or {}
+    return {key: config[key] for key in TUNED_KEYS if key in config} or None
+
+
+def show_calibration(calibration: dict):
+    """Mostra as medições da calibração como tabela."""
+    table = Table(title="⚙️ Autoajuste", box=box.ROUNDED, border_style="cyan", title_style="bold white")
+    table.add_column("Intervalo")
+    table.add_column("Whisper")
+    table.add_column("Processos OCR")
+    table.add_column("Vazão", style="blue")
+    table.add_column("Similaridade", style="magenta")
+    table.add_column("", style="green")
+
+    for trial in calibration['trials']:
+        config = trial['config']
+        table.add_row(
+            f"{config['frame_interval']:g}s", config['whisper_model'],
+            str(config['ocr_workers']),
+            f"{trial['throughput']:.2f}x", f"{trial['similarity']:.1%}",
+            "✓" if trial['accepted'] else "",
+        )
+
+    console.print(table)
+    speedup = calibration['throughput'] / max(calibration['reference_throughput'], 1e-6)
+    console.print(f"  [bold green]⚡ {speedup:.1f}x mais rápido que a referência "
+                  f"(similaridade {calibration['similarity']:.1%})[/bold green]")
+
+
+def run_autotune(paths: list, base_config: dict = None, tolerance: float = DEFAULT_TOLERANCE) -> str:
+    """
+    Calibra, mostra as medições e grava o perfil da máquina.
+
+    Returns:
+        Caminho do perfil gravado
+    """
+    console.print(f"\n[bold white]  ⚙️ Autoajuste em {len(paths)} vídeo(s) de amostra "
+                  f"(tolerância {tolerance:.0%})[/bold white]")
+    calibration = calibrate(paths, base_config, tolerance)
+    show_calibration(calibration)
+
+    path = save_profile(calibration, base_config, tolerance)
+    console.print(f"  💾 Perfil gravado em {path}\n")
+    return path
+
+
+def main():
+    """Autoajuste nos vídeos passados na linha de comando."""
+    args = sys.argv[1:]
+    tolerance = DEFAULT_TOLERANCE
+    base_config = {}
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--tolerancia' and i + 1 < len(args):
+            tolerance = float(args[i + 1])
+            i += 2
+        elif args[i] == '--ocr' and i + 1 < len(args):
+            base_config['ocr_engine'] = args[i + 1]
+            i += 2
+        else:
+            paths.append(args[i])
+            i += 1
+
+    if not paths:
+        console.print(__doc__)
+        sys.exit(1)
+
+    run_autotune(paths, base_config, tolerance)
+
+
+if __name__ == "__main__":
+    main()
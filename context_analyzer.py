@@ -1,14 +1,17 @@
 """
 Módulo de análise de contexto e geração de hashtags/descrições.
-Usa TF-IDF para extrair palavras-chave e gera conteúdo otimizado para TikTok.
+Tokeniza o texto uma vez, extrai palavras-chave (frequência ou TF-IDF) e gera
+conteúdo otimizado para TikTok.
 """
 
 import re
+import math
 import string
 from collections import Counter
-from sklearn.feature_extraction.text import TfidfVectorizer
 from rich.console import Console
 
+from tiktok_analyzer.hashtag_lexicon import get_lexicon
+
 console = Console()
 
 # Stop words em português e inglês comuns
@@ -102,43 +105,102 @@ TIKTOK_CATEGORIES = {
 UNIVERSAL_HASHTAGS = ['#fyp', '#foryou', '#viral', '#tiktok', '#parati', '#fy']
 
 
-def _clean_text(text: str) -> str:
-    """Remove caracteres especiais e normaliza o texto."""
-    text = text.lower()
-    text = re.sub(r'[^\w\sáàâãéèêíìîóòôõúùûçñ]', ' ', text)
-    text = re.sub(r'\s+', ' ', text)
-    return text.strip()
+# Divide o texto em sentenças (antes de remover a pontuação)
+_SENTENCE_RE = re.compile(r'[.!?\n]+')
+
+# Palavras (letras, números e acentos)
+_WORD_RE = re.compile(r'[\wáàâãéèêíìîóòôõúùûçñ]+')
+
+# Caracteres que não podem entrar em uma hashtag
+_TAG_STRIP_RE = re.compile(r'[^a-záàâãéèêíìîóòôõúùûçña-z0-9]')
+
+# Textos com menos termos que isso usam contagem de frequência (sem scikit-learn)
+FAST_PATH_MAX_TERMS = 40
+
+# Palavras-chave das categorias já em minúsculas
+_CATEGORY_KEYWORDS = {
+    cat_name: [kw.lower() for kw in cat_data['keywords']]
+    for cat_name, cat_data in TIKTOK_CATEGORIES.items()
+}
+
+
+def _tag_form(word: str) -> str:
+    """Forma da palavra usada na hashtag (só letras, números e acentos)."""
+    if word.isascii() and word.isalnum():
+        return word
+    return _TAG_STRIP_RE.sub('', word)
+
+
+def _tokenize(text: str) -> dict:
+    """
+    Normaliza e tokeniza o texto uma única vez para toda a análise.
+    
+    Returns:
+        Dict com:
+            'text': texto normalizado (tokens em minúsculas separados por espaço)
+            'sentences': lista de termos de cada sentença
+            'counts': Counter dos termos (sem stop words, 3+ letras)
+            'tags': termo -> forma usada na hashtag
+    """
+    sentences = []
+    tokens = []
+    
+    for raw_sentence in _SENTENCE_RE.split(text.lower()):
+        sentence_tokens = _WORD_RE.findall(raw_sentence)
+        if not sentence_tokens:
+            continue
+        tokens.extend(sentence_tokens)
+        terms = [t for t in sentence_tokens if t not in STOP_WORDS_PT and len(t) > 2]
+        if terms:
+            sentences.append(terms)
+    
+    counts = Counter(term for terms in sentences for term in terms)
+    
+    return {
+        'text': " ".join(tokens),
+        'sentences': sentences,
+        'counts': counts,
+        'tags': {term: _tag_form(term) for term in counts},
+        'n_tokens': len(tokens),
+    }
+
+
+def _analyzer(terms: list) -> list:
+    """Analyzer do TF-IDF: as sentenças já chegam tokenizadas."""
+    return terms
 
 
-def _extract_keywords_tfidf(text: str, top_n: int = 20) -> list:
+def _extract_keywords(doc: dict, top_n: int = 20) -> list:
     """
-    Extrai palavras-chave usando TF-IDF.
+    Extrai palavras-chave do texto tokenizado.
+    
+    Textos curtos (típicos de OCR) ou de uma sentença só usam contagem de
+    frequência direto; textos maiores usam TF-IDF entre as sentenças.
     
     Args:
-        text: Texto para analisar
+        doc: Texto tokenizado por _tokenize
         top_n: Número de palavras-chave a retornar
     
     Returns:
         Lista de (palavra, score) ordenada por relevância
     """
-    if not text or len(text.split()) < 3:
+    if doc['n_tokens'] < 3:
         return []
     
-    # Divide o texto em "documentos" (sentenças) para melhor TF-IDF
-    sentences = re.split(r'[.!?\n]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 5]
+    sentences = doc['sentences']
+    n_terms = sum(len(terms) for terms in sentences)
     
-    if len(sentences) < 2:
-        # Se há poucas sentenças, divide por palavras
-        sentences = [text]
+    if len(sentences) < 2 or n_terms < FAST_PATH_MAX_TERMS:
+        return doc['counts'].most_common(top_n)
     
     try:
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        
         vectorizer = TfidfVectorizer(
+            analyzer=_analyzer,
             max_features=100,
-            stop_words=list(STOP_WORDS_PT),
             min_df=1,
             max_df=0.95,
-            token_pattern=r'(?u)\b[a-záàâãéèêíìîóòôõúùûçñ]{3,}\b'
         )
         
         tfidf_matrix = vectorizer.fit_transform(sentences)
@@ -153,28 +215,24 @@ def _extract_keywords_tfidf(text: str, top_n: int = 20) -> list:
     
     except Exception:
         # Fallback: usa contagem de frequência simples
-        words = _clean_text(text).split()
-        words = [w for w in words if w not in STOP_WORDS_PT and len(w) > 2]
-        counter = Counter(words)
-        return counter.most_common(top_n)
+        return doc['counts'].most_common(top_n)
 
 
-def _detect_categories(text: str, keywords: list) -> list:
+def _detect_categories(doc: dict, keywords: list) -> list:
     """
     Detecta categorias de conteúdo baseado no texto e palavras-chave.
     
     Returns:
         Lista de (categoria, score) ordenada por relevância
     """
-    text_lower = text.lower()
-    keyword_words = {kw[0].lower() for kw in keywords}
+    text_lower = doc['text']
+    keyword_words = {kw[0] for kw in keywords}
     
     category_scores = []
     
-    for cat_name, cat_data in TIKTOK_CATEGORIES.items():
+    for cat_name, cat_keywords in _CATEGORY_KEYWORDS.items():
         score = 0
-        for kw in cat_data['keywords']:
-            kw_lower = kw.lower()
+        for kw_lower in cat_keywords:
             if kw_lower in text_lower:
                 score += 2
             if kw_lower in keyword_words:
@@ -187,21 +245,54 @@ def _detect_categories(text: str, keywords: list) -> list:
     return category_scores
 
 
-def _generate_hashtags_from_keywords(keywords: list, max_hashtags: int = 8) -> list:
-    """Gera hashtags a partir das palavras-chave extraídas."""
-    hashtags = []
+def _generate_hashtags_from_keywords(keywords: list, max_hashtags: int = 8, lexicon=None,
+                                     tag_forms: dict = None) -> list:
+    """
+    Gera hashtags a partir das palavras-chave extraídas.
+    
+    Com um léxico de hashtags (veja hashtag_lexicon), as palavras que
+    correspondem a hashtags conhecidas usam a grafia do léxico e vêm
+    primeiro, ordenadas por relevância x popularidade.
+    
+    tag_forms (de _tokenize) evita renormalizar cada palavra.
+    """
+    tag_forms = tag_forms or {}
+    
+    if lexicon is None:
+        hashtags = []
+        
+        for word, score in keywords:
+            word_clean = tag_forms.get(word) or _tag_form(word.lower())
+            if len(word_clean) >= 3 and word_clean not in STOP_WORDS_PT:
+                tag = f"#{word_clean}"
+                if tag not in hashtags:
+                    hashtags.append(tag)
+            
+            if len(hashtags) >= max_hashtags:
+                break
+        
+        return hashtags
+    
+    candidates = {}  # tag -> (conhecida, ranking)
     
     for word, score in keywords:
-        word_clean = re.sub(r'[^a-záàâãéèêíìîóòôõúùûçña-z0-9]', '', word.lower())
-        if len(word_clean) >= 3 and word_clean not in STOP_WORDS_PT:
+        word_clean = tag_forms.get(word) or _tag_form(word.lower())
+        if len(word_clean) < 3 or word_clean in STOP_WORDS_PT:
+            continue
+        
+        match = lexicon.lookup(word_clean)
+        if match:
+            tag, popularity = match
+            rank = (True, float(score) * (1 + math.log1p(max(popularity, 0))))
+        else:
             tag = f"#{word_clean}"
-            if tag not in hashtags:
-                hashtags.append(tag)
+            rank = (False, float(score))
         
-        if len(hashtags) >= max_hashtags:
-            break
+        if tag not in candidates or rank > candidates[tag]:
+            candidates[tag] = rank
     
-    return hashtags
+    ranked = sorted(candidates, key=lambda tag: candidates[tag], reverse=True)
+    return ranked[:max_hashtags]
 
 
 def _generate_description(ocr_text: str, transcription: str, keywords: list, categories: list) -> str:
@@ -304,12 +395,14 @@ def analyze_content(ocr_texts: list, transcription_result: dict) -> dict:
             'categories': [],
         }
     
-    # 1. Extrai palavras-chave via TF-IDF
-    cleaned_text = _clean_text(combined_text)
-    keywords = _extract_keywords_tfidf(cleaned_text)
+    # Normaliza e tokeniza uma vez só para as três etapas
+    doc = _tokenize(combined_text)
+    
+    # 1. Extrai palavras-chave (frequência ou TF-IDF)
+    keywords = _extract_keywords(doc)
     
     # 2. Detecta categorias
-    categories = _detect_categories(combined_text, keywords)
+    categories = _detect_categories(doc, keywords)
     
     # 3. Gera hashtags
     # Hashtags da categoria detectada
@@ -320,7 +413,8 @@ def analyze_content(ocr_texts: list, transcription_result: dict) -> dict:
         category_hashtags.extend(cat_tags[:3])
     
     # Hashtags das palavras-chave
-    keyword_hashtags = _generate_hashtags_from_keywords(keywords, max_hashtags=5)
+    keyword_hashtags = _generate_hashtags_from_keywords(keywords, max_hashtags=5, lexicon=get_lexicon(),
+                                                        tag_forms=doc['tags'])
     
     # Combina: categoria + keywords + universais (sem duplicatas)
     all_hashtags = []
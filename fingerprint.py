@@ -0,0 +1,422 @@
+"""
+Impressão digital perceptual de vídeos.
+Reconhece o mesmo clipe reenviado, recodificado, recortado ou aparado — que
+um hash do arquivo não pega — para reaproveitar a análise anterior em vez
+de pagar OCR e Whisper de novo.
+
+A impressão sai de graça da ingestão:
+    - frames: sequência de dHash de 64 bits (da região central do frame)
+    - áudio:  sub-impressões de 32 bits a cada 1/32 s, com o sinal da
+              variação de energia entre bandas vizinhas e no tempo
+              (o esquema de Haitsma & Kalker)
+
+O índice é um SQLite com as impressões e bandas de LSH (pedaços dos hashes)
+para achar candidatos sem comparar com todos os vídeos; os candidatos são
+confirmados alinhando as sequências no melhor deslocamento. O vídeo já
+analisado precisa cobrir o novo (não o contrário), e o áudio, quando os
+dois têm, pode vetar a reutilização.
+
+Comparação de um vídeo novo com um já analisado:
+    python3 -m tiktok_analyzer.fingerprint novo.mp4 analisado.mp4
+"""
+
+import os
+import sys
+import json
+import sqlite3
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+import cv2
+import numpy as np
+from rich.console import Console
+
+from tiktok_analyzer.video_processor import AUDIO_SAMPLE_RATE
+
+console = Console()
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados", "impressoes.db")
+
+# Fração central do frame usada no hash (tolera recortes e marcas d'água nas bordas)
+CENTER_CROP = 0.8
+
+# Bits diferentes para dois frames contarem como iguais
+FRAME_MAX_DISTANCE = 10
+
+# Janela da FFT do áudio (amostras), passo entre sub-impressões e bandas
+AUDIO_WINDOW = 4096
+AUDIO_HOP = 500
+AUDIO_BANDS = 33
+AUDIO_MIN_FREQ = 300
+AUDIO_MAX_FREQ = 3000
+
+# Similaridade mínima (0-1) para reaproveitar um resultado
+MATCH_THRESHOLD = 0.8
+
+# Similaridade mínima do áudio quando os dois vídeos têm som (abaixo disso,
+# veta a reutilização mesmo com os frames iguais: mesmo cenário, outra fala)
+AUDIO_MIN_SIMILARITY = 0.2
+
+# Sobreposição mínima para comparar duas sequências (frames / sub-impressões de áudio)
+MIN_OVERLAP = 3
+MIN_AUDIO_OVERLAP = 96
+
+# Candidatos do LSH confirmados por consulta
+MAX_CANDIDATES = 5
+
+# Tipos de banda no índice: 0-3 são os 4 pedaços de 16 bits do dHash
+AUDIO_BAND = 4
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    id             INTEGER PRIMARY KEY,
+    video          TEXT NOT NULL,
+    added_at       TEXT NOT NULL,
+    duration       REAL NOT NULL,
+    frame_interval REAL NOT NULL,
+    frame_hashes   BLOB NOT NULL,
+    audio_hashes   BLOB NOT NULL,
+    result         TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS bands (
+    kind           INTEGER NOT NULL,
+    key            INTEGER NOT NULL,
+    fingerprint_id INTEGER NOT NULL REFERENCES fingerprints(id)
+);
+CREATE INDEX IF NOT EXISTS idx_bands_key ON bands(kind, key);
+"""
+
+
+def frame_hash(frame) -> int:
+    """
+    Calcula o dHash (64 bits) da região central de um frame.
+
+    Args:
+        frame: Frame BGR (numpy array)
+
+    Returns:
+        Hash como inteiro sem sinal
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape
+    margin_y = int(height * (1 - CENTER_CROP) / 2)
+    margin_x = int(width * (1 - CENTER_CROP) / 2)
+    center = gray[margin_y:height - margin_y, margin_x:width - margin_x]
+
+    small = cv2.resize(center, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int(np.packbits(bits).view('>u8')[0])
+
+
+@lru_cache(maxsize=4)
+def _band_filter(sample_rate: int, window: int) -> np.ndarray:
+    """Matriz (bins da FFT x bandas) que soma cada bin na sua banda logarítmica."""
+    freqs = np.fft.rfftfreq(window, 1.0 / sample_rate)
+    edges = np.geomspace(AUDIO_MIN_FREQ, AUDIO_MAX_FREQ, AUDIO_BANDS + 1)
+    band = np.searchsorted(edges, freqs, side='right') - 1
+    valid = (band >= 0) & (band < AUDIO_BANDS)
+
+    matrix = np.zeros((len(freqs), AUDIO_BANDS), dtype=np.float32)
+    matrix[np.nonzero(valid)[0], band[valid]] = 1.0
+    return matrix
+
+
+def audio_hashes(audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray:
+    """
+    Calcula as sub-impressões do áudio (32 bits a cada AUDIO_HOP amostras).
+
+    Cada bit é o sinal de (E[t, b] - E[t, b+1]) - (E[t-1, b] - E[t-1, b+1]),
+    com E a energia em log da banda: sobrevive a recodificação, ganho e
+    ruído, mas dois sinais diferentes (inclusive dois ruídos) dão bits
+    independentes.
+
+    Args:
+        audio: Áudio mono float32
+        sample_rate: Taxa de amostragem
+
+    Returns:
+        Array uint32 (0 = trecho em silêncio, sem informação)
+    """
+    if len(audio) < AUDIO_WINDOW + AUDIO_HOP:
+        return np.zeros(0, dtype=np.uint32)
+
+    mapping = _band_filter(sample_rate, AUDIO_WINDOW)
+    hann = np.hanning(AUDIO_WINDOW).astype(np.float32)
+    windows = np.lib.stride_tricks.sliding_window_view(audio, AUDIO_WINDOW)[::AUDIO_HOP]
+    energies = np.empty((len(windows), AUDIO_BANDS), dtype=np.float32)
+
+    # Em blocos, para não alocar a FFT do vídeo inteiro de uma vez
+    for start in range(0, len(windows), 256):
+        block = windows[start:start + 256] * hann
+        power = np.abs(np.fft.rfft(block, axis=1)) ** 2
+        energies[start:start + len(block)] = power @ mapping
+
+    total = energies.sum(axis=1)
+    loud = total > total.max() * 1e-4
+
+    log_energy = np.log(energies + 1e-10)
+    band_diff = log_energy[:, :-1] - log_energy[:, 1:]
+    bits = (band_diff[1:] - band_diff[:-1]) > 0
+
+    values = np.packbits(bits, axis=1, bitorder='little').view('<u4')[:, 0].astype(np.uint32)
+    values[~(loud[1:] & loud[:-1])] = 0
+    return values
+
+
+def compute_fingerprint(frames: list, audio, frame_interval: float) -> dict:
+    """
+    Monta a impressão de um vídeo a partir do que a ingestão já extraiu.
+
+    Args:
+        frames: Frames BGR amostrados (ou None)
+        audio: Áudio mono float32 (ou None / caminho de arquivo, ignorados)
+        frame_interval: Intervalo entre os frames (segundos)
+
+    Returns:
+        Dict com 'frame_hashes', 'frame_interval' e 'audio_hashes', ou None
+        se não houver frames (sem eles a impressão não é confiável)
+    """
+    if not frames:
+        return None
+
+    hashes = np.array([frame_hash(frame) for frame in frames], dtype=np.uint64)
+    if isinstance(audio, np.ndarray):
+        audio_bits = audio_hashes(audio)
+    else:
+        audio_bits = np.zeros(0, dtype=np.uint32)
+
+    return {'frame_hashes': hashes, 'frame_interval': float(frame_interval), 'audio_hashes': audio_bits}
+
+
+def _popcount(values: np.ndarray) -> np.ndarray:
+    return np.unpackbits(values.view(np.uint8).reshape(len(values), -1), axis=1).sum(axis=1)
+
+
+def _best_alignment(n_new: int, n_stored: int, score) -> float:
+    """
+    Melhor pontuação entre todos os deslocamentos de duas sequências.
+
+    score(new_slice, stored_slice) devolve a soma das semelhanças dos pares
+    alinhados, dividida pelo tamanho do vídeo novo: só vale 1 quando o vídeo
+    já analisado cobre o novo inteiro. Um trecho aparado de um vídeo
+    conhecido é reaproveitado, mas um vídeo longo que só contém um clipe
+    conhecido não.
+    """
+    min_overlap = min(MIN_OVERLAP, n_new, n_stored)
+    best = 0.0
+    for shift in range(-(n_stored - min_overlap), n_new - min_overlap + 1):
+        lo = max(0, shift)
+        hi = min(n_new, shift + n_stored)
+        best = max(best, score(slice(lo, hi), slice(lo - shift, hi - shift)) / n_new)
+    return best
+
+
+def frame_similarity(new: dict, stored: dict) -> float:
+    """
+    Fração (0-1) dos frames do vídeo novo encontrada no já analisado, ou
+    None se não der para comparar (intervalos incompatíveis).
+    """
+    hashes_a, hashes_b = new['frame_hashes'], stored['frame_hashes']
+
+    # Intervalos diferentes: subamostra a sequência mais densa, se for múltiplo
+    ratio = stored['frame_interval'] / new['frame_interval']
+    if abs(ratio - round(ratio)) < 1e-6 and round(ratio) >= 1:
+        hashes_a = hashes_a[::int(round(ratio))]
+    elif abs(1 / ratio - round(1 / ratio)) < 1e-6:
+        hashes_b = hashes_b[::int(round(1 / ratio))]
+    else:
+        return None
+
+    if len(hashes_a) == 0 or len(hashes_b) == 0:
+        return None
+
+    def score(sa, sb):
+        distances = _popcount(hashes_a[sa] ^ hashes_b[sb])
+        return float((distances <= FRAME_MAX_DISTANCE).sum())
+
+    return _best_alignment(len(hashes_a), len(hashes_b), score)
+
+
+def _bit_planes(values: np.ndarray) -> np.ndarray:
+    """Bits das sub-impressões como +1/-1 (linhas em silêncio zeradas)."""
+    bits = np.unpackbits(values.astype('<u4').view(np.uint8).reshape(len(values), 4), axis=1, bitorder='little')
+    planes = bits.astype(np.float32) * 2 - 1
+    planes[values == 0] = 0
+    return planes
+
+
+def audio_similarity(new: dict, stored: dict) -> float:
+    """
+    Fração (0-1) do áudio do vídeo novo encontrada no já analisado, ou None
+    se um dos dois não tiver som.
+
+    Cada par alinhado vale 1 - 2 * (fração de bits diferentes): áudio igual
+    fica perto de 1 e áudios sem relação (inclusive dois ruídos) em torno de
+    0. Como a nota é linear, todos os deslocamentos saem de uma correlação
+    só (via FFT), em vez de comparar deslocamento por deslocamento.
+    """
+    hashes_a, hashes_b = new['audio_hashes'], stored['audio_hashes']
+    voiced = int(np.count_nonzero(hashes_a))
+    if voiced < MIN_AUDIO_OVERLAP or np.count_nonzero(hashes_b) < MIN_AUDIO_OVERLAP:
+        return None
+
+    planes_a, planes_b = _bit_planes(hashes_a), _bit_planes(hashes_b)
+    size = 1 << (len(hashes_a) + len(hashes_b) - 1).bit_length()
+    spectrum = (np.fft.rfft(planes_a, size, axis=0) * np.conj(np.fft.rfft(planes_b, size, axis=0))).sum(axis=1)
+    agreement = np.fft.irfft(spectrum, size)
+
+    return max(0.0, float(agreement.max()) / (32 * voiced))
+
+
+def compare(new: dict, stored: dict) -> float:
+    """
+    Similaridade (0-1) de um vídeo novo com um já analisado.
+
+    A nota é a dos frames, que são obrigatórios: o áudio sozinho não basta,
+    porque o mesmo som em alta aparece em vídeos diferentes. Quando os dois
+    têm som, o áudio funciona como veto: o mesmo cenário com outra fala
+    não reaproveita transcrição e hashtags.
+    """
+    frames = frame_similarity(new, stored)
+    if frames is None:
+        return 0.0
+
+    audio = audio_similarity(new, stored)
+    if audio is not None and audio < AUDIO_MIN_SIMILARITY:
+        return 0.0
+    return frames
+
+
+def _band_keys(fingerprint: dict) -> set:
+    """Chaves de LSH (tipo, valor) de uma impressão."""
+    keys = set()
+    for value in fingerprint['frame_hashes'].tolist():
+        if value in (0, 0xFFFFFFFFFFFFFFFF):
+            # Frames lisos (tela preta/branca) batem com qualquer vídeo
+            continue
+        for band in range(4):
+            keys.add((band, (value >> (16 * band)) & 0xFFFF))
+
+    # Áudio: sub-impressões inteiras (trechos em silêncio ficam de fora)
+    for value in np.unique(fingerprint['audio_hashes']).tolist():
+        if value:
+            keys.add((AUDIO_BAND, value))
+
+    return keys
+
+
+def open_index(index_path: str = None) -> sqlite3.Connection:
+    """
+    Abre (ou cria) o índice de impressões.
+
+    Args:
+        index_path: Caminho do arquivo SQLite (padrão: resultados/impressoes.db)
+
+    Returns:
+        Conexão SQLite pronta para uso
+    """
+    index_path = index_path or DEFAULT_INDEX_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+
+    conn = sqlite3.connect(index_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def add_fingerprint(conn: sqlite3.Connection, video: str, fingerprint: dict, result: dict, duration: float = 0.0):
+    """
+    Guarda a impressão de um vídeo analisado junto com o resultado.
+
+    Args:
+        conn: Conexão retornada por open_index
+        video: Nome do vídeo
+        fingerprint: Impressão (compute_fingerprint)
+        result: Dict de resultado da análise
+        duration: Duração do vídeo (segundos)
+    """
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO fingerprints (video, added_at, duration, frame_interval, frame_hashes, audio_hashes, result)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (video, datetime.now().isoformat(), duration, fingerprint['frame_interval'],
+             fingerprint['frame_hashes'].astype('<u8').tobytes(),
+             fingerprint['audio_hashes'].astype('<u4').tobytes(),
+             json.dumps(result, ensure_ascii=False, default=float))
+        )
+        conn.executemany(
+            "INSERT INTO bands (kind, key, fingerprint_id) VALUES (?, ?, ?)",
+            [(kind, key, cursor.lastrowid) for kind, key in _band_keys(fingerprint)]
+        )
+
+
+def find_match(conn: sqlite3.Connection, fingerprint: dict, threshold: float = MATCH_THRESHOLD):
+    """
+    Procura um vídeo já analisado que seja quase igual.
+
+    Args:
+        conn: Conexão retornada por open_index
+        fingerprint: Impressão do vídeo novo
+        threshold: Similaridade mínima (0-1)
+
+    Returns:
+        Tupla (resultado guardado, nome do vídeo original, similaridade) ou None
+    """
+    hits = Counter()
+    for kind, key in _band_keys(fingerprint):
+        for (fingerprint_id,) in conn.execute(
+                "SELECT fingerprint_id FROM bands WHERE kind = ? AND key = ?", (kind, key)):
+            hits[fingerprint_id] += 1
+
+    best = None
+    for fingerprint_id, _ in hits.most_common(MAX_CANDIDATES):
+        video, frame_interval, frame_hashes, audio_hashes, result = conn.execute(
+            "SELECT video, frame_interval, frame_hashes, audio_hashes, result FROM fingerprints WHERE id = ?",
+            (fingerprint_id,)
+        ).fetchone()
+        stored = {
+            'frame_hashes': np.frombuffer(frame_hashes, dtype='<u8').astype(np.uint64),
+            'frame_interval': frame_interval,
+            'audio_hashes': np.frombuffer(audio_hashes, dtype='<u4').astype(np.uint32),
+        }
+        score = compare(fingerprint, stored)
+        if score >= threshold and (best is None or score > best[2]):
+            best = (json.loads(result), video, score)
+
+    return best
+
+
+def main():
+    """Compara um vídeo novo com um já analisado (na linha de comando)."""
+    from tiktok_analyzer.video_processor import demux_video
+
+    if len(sys.argv) != 3:
+        console.print(__doc__)
+        sys.exit(1)
+
+    prints = []
+    for path in sys.argv[1:]:
+        ingest = demux_video(path)
+        if ingest is None:
+            console.print(f"[red]❌ Não foi possível ler {path} (FFmpeg necessário)[/red]")
+            sys.exit(1)
+        prints.append(compute_fingerprint(ingest['frames'], ingest['audio'], 2.0))
+
+    if None in prints:
+        console.print("[red]❌ Vídeo sem frames[/red]")
+        sys.exit(1)
+
+    a, b = prints
+    frames = frame_similarity(a, b)
+    audio = audio_similarity(a, b)
+    score = compare(a, b)
+    console.print(f"  🖼️ Frames: {'—' if frames is None else f'{frames:.1%}'}")
+    console.print(f"  🎵 Áudio: {'—' if audio is None else f'{audio:.1%}'}")
+    verdict = "[green]mesmo vídeo[/green]" if score >= MATCH_THRESHOLD else "[yellow]vídeos diferentes[/yellow]"
+    console.print(f"  🔎 Similaridade: {score:.1%} — {verdict}")
+
+
+if __name__ == "__main__":
+    main()
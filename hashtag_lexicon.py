@@ -0,0 +1,360 @@
+"""
+Léxico compilado de hashtags conhecidas.
+Guarda milhões de hashtags com sua popularidade em um arquivo binário
+ordenado, lido via mmap: abrir o léxico não faz parsing nem copia nada
+para a RAM, e processos diferentes compartilham as mesmas páginas.
+
+Uso:
+    python3 -m tiktok_analyzer.hashtag_lexicon compilar hashtags.tsv [hashtags.lex]
+    python3 -m tiktok_analyzer.hashtag_lexicon buscar motiva
+
+O arquivo de origem tem uma hashtag por linha: "hashtag<TAB>popularidade".
+
+Formato do arquivo compilado (little-endian):
+    cabeçalho   '<4sIQQQQQQ': magic, versão, n, tamanho das chaves, tamanho
+                das tags, p (prefixos amplos), tamanho dos prefixos, top por prefixo
+    offsets     (n + 1) x uint64 das chaves normalizadas
+    offsets     (n + 1) x uint64 das tags originais
+    scores      n x float32 (com padding até múltiplo de 8 bytes)
+    offsets     (p + 1) x uint64 dos prefixos amplos
+    tops        p x top x uint32: índices das hashtags mais populares de cada
+                prefixo amplo, da mais popular para a menos (com padding)
+    chaves      UTF-8 concatenado, em ordem crescente de bytes
+    tags        UTF-8 concatenado, na mesma ordem das chaves
+    prefixos    UTF-8 concatenado, em ordem crescente de bytes
+
+Prefixos amplos são os que casam com mais de PREFIX_SCAN_LIMIT hashtags: a
+busca usa a lista pronta deles em vez de percorrer o intervalo inteiro.
+"""
+
+import os
+import re
+import sys
+import mmap
+import heapq
+import bisect
+import struct
+import unicodedata
+from rich.console import Console
+
+console = Console()
+
+MAGIC = b'HLEX'
+VERSION = 2
+HEADER = struct.Struct('<4sIQQQQQQ')
+
+# Caminho padrão do léxico (pode ser trocado pela variável de ambiente)
+DEFAULT_LEXICON_PATH = os.environ.get(
+    'TIKTOK_HASHTAG_LEXICON',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hashtags.lex')
+)
+
+# Máximo de hashtags examinadas por busca de prefixo; prefixos que casam
+# com mais que isso (curtos, como 'a') têm o top pré-calculado na compilação
+PREFIX_SCAN_LIMIT = 10_000
+
+# Tamanho do top guardado por prefixo amplo (máximo de resultados dessas buscas)
+PREFIX_TOP = 100
+
+# Índice vazio nas listas de top (prefixo com menos de PREFIX_TOP hashtags)
+_NO_ENTRY = 0xFFFFFFFF
+
+# Léxico carregado (singleton); False = já procurado e não encontrado
+_lexicon = None
+
+
+def normalize_tag(text: str) -> str:
+    """
+    Normaliza uma hashtag/palavra para busca: minúsculas, sem '#',
+    sem acentos e só com letras e números ('#Motivação' -> 'motivacao').
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r'[^a-z0-9]', '', text)
+
+
+def _broad_prefixes(keys: list, scores: list) -> list:
+    """
+    Calcula o top de cada prefixo amplo (mais de PREFIX_SCAN_LIMIT chaves).
+
+    Desce pela árvore de prefixos só onde o intervalo é grande; os filhos de
+    um prefixo são achados com buscas binárias na lista ordenada.
+
+    Returns:
+        Lista ordenada de (prefixo, índices do top por popularidade)
+    """
+    table = []
+    stack = [(b'', 0, len(keys))]
+    while stack:
+        prefix, lo, hi = stack.pop()
+        if hi - lo <= PREFIX_SCAN_LIMIT:
+            continue
+        if prefix:
+            table.append((prefix, heapq.nlargest(PREFIX_TOP, range(lo, hi), key=scores.__getitem__)))
+
+        depth = len(prefix) + 1
+        i = lo + 1 if len(keys[lo]) < depth else lo
+        while i < hi:
+            child = keys[i][:depth]
+            j = bisect.bisect_left(keys, child + b'\xff', i, hi)
+            stack.append((child, i, j))
+            i = j
+
+    table.sort()
+    return table
+
+
+def compile_lexicon(source_path: str, output_path: str) -> int:
+    """
+    Compila um arquivo TSV de hashtags no formato binário do léxico.
+
+    Hashtags com a mesma forma normalizada são unidas, ficando a grafia
+    de maior popularidade.
+
+    Args:
+        source_path: Arquivo com "hashtag<TAB>popularidade" por linha
+        output_path: Arquivo .lex a gerar
+
+    Returns:
+        Número de hashtags no léxico
+    """
+    best = {}  # chave normalizada -> (score, tag)
+
+    with open(source_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            tag = parts[0].strip()
+            if not tag:
+                continue
+
+            try:
+                score = float(parts[1]) if len(parts) > 1 else 0.0
+            except ValueError:
+                continue
+
+            key = normalize_tag(tag)
+            if not key:
+                continue
+            if not tag.startswith('#'):
+                tag = f"#{tag}"
+
+            if key not in best or score > best[key][0]:
+                best[key] = (score, tag)
+
+    entries = sorted((key.encode('utf-8'), tag.encode('utf-8'), score)
+                     for key, (score, tag) in best.items())
+    count = len(entries)
+
+    key_offsets = [0]
+    tag_offsets = [0]
+    for key, tag, _ in entries:
+        key_offsets.append(key_offsets[-1] + len(key))
+        tag_offsets.append(tag_offsets[-1] + len(tag))
+
+    scores = struct.pack(f'<{count}f', *(score for _, _, score in entries))
+    scores += b'\0' * (-len(scores) % 8)
+
+    # Os scores arredondados para float32, como a busca vai compará-los
+    stored_scores = struct.unpack(f'<{count}f', scores[:4 * count])
+    broad = _broad_prefixes([key for key, _, _ in entries], stored_scores)
+    prefix_offsets = [0]
+    tops = []
+    for prefix, top in broad:
+        prefix_offsets.append(prefix_offsets[-1] + len(prefix))
+        tops.extend(top + [_NO_ENTRY] * (PREFIX_TOP - len(top)))
+    tops = struct.pack(f'<{len(tops)}I', *tops)
+    tops += b'\0' * (-len(tops) % 8)
+
+    with open(output_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, key_offsets[-1], tag_offsets[-1],
+                            len(broad), prefix_offsets[-1], PREFIX_TOP))
+        f.write(struct.pack(f'<{count + 1}Q', *key_offsets))
+        f.write(struct.pack(f'<{count + 1}Q', *tag_offsets))
+        f.write(scores)
+        f.write(struct.pack(f'<{len(broad) + 1}Q', *prefix_offsets))
+        f.write(tops)
+        for key, _, _ in entries:
+            f.write(key)
+        for _, tag, _ in entries:
+            f.write(tag)
+        for prefix, _ in broad:
+            f.write(prefix)
+
+    return count
+
+
+class HashtagLexicon:
+    """Léxico de hashtags somente leitura, mapeado em memória."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+
+        magic, version = struct.unpack_from('<4sI', self._buffer, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Arquivo de léxico inválido (recompile): {path}")
+
+        (_, _, count, keys_size, tags_size,
+         prefix_count, prefixes_size, prefix_top) = HEADER.unpack_from(self._buffer, 0)
+        self._count = count
+        self._prefix_count = prefix_count
+        self._prefix_top = prefix_top
+        pos = HEADER.size
+        self._key_offsets = self._buffer[pos:pos + 8 * (count + 1)].cast('Q')
+        pos += 8 * (count + 1)
+        self._tag_offsets = self._buffer[pos:pos + 8 * (count + 1)].cast('Q')
+        pos += 8 * (count + 1)
+        self._scores = self._buffer[pos:pos + 4 * count].cast('f')
+        pos += 4 * count + (-4 * count % 8)
+        self._prefix_offsets = self._buffer[pos:pos + 8 * (prefix_count + 1)].cast('Q')
+        pos += 8 * (prefix_count + 1)
+        tops_size = 4 * prefix_count * prefix_top
+        self._tops = self._buffer[pos:pos + tops_size].cast('I')
+        pos += tops_size + (-tops_size % 8)
+        self._keys = self._buffer[pos:pos + keys_size]
+        pos += keys_size
+        self._tags = self._buffer[pos:pos + tags_size]
+        pos += tags_size
+        self._prefixes = self._buffer[pos:pos + prefixes_size]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, text: str) -> bool:
+        return self.lookup(text) is not None
+
+    def _key(self, i: int) -> bytes:
+        return bytes(self._keys[self._key_offsets[i]:self._key_offsets[i + 1]])
+
+    def _entry(self, i: int) -> tuple:
+        tag = bytes(self._tags[self._tag_offsets[i]:self._tag_offsets[i + 1]])
+        return tag.decode('utf-8'), float(self._scores[i])
+
+    def _broad_top(self, key: bytes):
+        """Índices do top pré-calculado de um prefixo amplo, ou None."""
+        lo, hi = 0, self._prefix_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(self._prefixes[self._prefix_offsets[mid]:self._prefix_offsets[mid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._prefix_count:
+            return None
+        if bytes(self._prefixes[self._prefix_offsets[lo]:self._prefix_offsets[lo + 1]]) != key:
+            return None
+        top = self._tops[lo * self._prefix_top:(lo + 1) * self._prefix_top]
+        return [i for i in top if i != _NO_ENTRY]
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Primeiro índice cuja chave é >= key (busca binária)."""
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def lookup(self, text: str):
+        """
+        Busca uma hashtag pela forma normalizada.
+
+        Returns:
+            (hashtag, popularidade) ou None se não existir
+        """
+        key = normalize_tag(text).encode('utf-8')
+        if not key:
+            return None
+
+        i = self._lower_bound(key)
+        if i < self._count and self._key(i) == key:
+            return self._entry(i)
+        return None
+
+    def prefix(self, text: str, limit: int = 10) -> list:
+        """
+        Busca hashtags que começam com o texto (normalizado).
+
+        As chaves com o prefixo formam um intervalo contínuo (achado com
+        duas buscas binárias). Intervalos de até PREFIX_SCAN_LIMIT chaves
+        são percorridos guardando as `limit` mais populares num heap; os
+        maiores usam o top calculado na compilação (no máximo PREFIX_TOP
+        resultados). Só as escolhidas são decodificadas.
+
+        Returns:
+            Lista de (hashtag, popularidade), mais populares primeiro
+        """
+        key = normalize_tag(text).encode('utf-8')
+        if not key:
+            return []
+
+        # Chaves normalizadas são ASCII: todas com o prefixo ficam antes de key + 0xff
+        start = self._lower_bound(key)
+        end = self._lower_bound(key + b'\xff')
+
+        best = None
+        if end - start > PREFIX_SCAN_LIMIT:
+            best = self._broad_top(key)
+        if best is not None:
+            best = best[:limit]
+        else:
+            # Intervalo pequeno (ou léxico compilado com outro limite: percorre tudo)
+            best = heapq.nlargest(limit, range(start, end), key=self._scores.__getitem__)
+        return [self._entry(i) for i in best]
+
+    def close(self):
+        """Libera o mapeamento do arquivo."""
+        for attr in ('_key_offsets', '_tag_offsets', '_scores', '_prefix_offsets', '_tops',
+                     '_keys', '_tags', '_prefixes', '_buffer'):
+            view = getattr(self, attr, None)
+            if view is not None:
+                view.release()
+        self._mmap.close()
+        self._file.close()
+
+
+def get_lexicon(path: str = None):
+    """
+    Retorna o léxico de hashtags (abre na primeira chamada).
+
+    Returns:
+        HashtagLexicon, ou None se não houver léxico compilado
+    """
+    global _lexicon
+    if _lexicon is None:
+        path = path or DEFAULT_LEXICON_PATH
+        if os.path.exists(path):
+            _lexicon = HashtagLexicon(path)
+            console.print(f"  📚 Léxico de hashtags: {len(_lexicon)} hashtags conhecidas")
+        else:
+            _lexicon = False
+    return _lexicon or None
+
+
+def main():
+    """CLI para compilar e consultar o léxico."""
+    args = sys.argv[1:]
+
+    if len(args) >= 2 and args[0] == 'compilar':
+        output_path = args[2] if len(args) > 2 else DEFAULT_LEXICON_PATH
+        count = compile_lexicon(args[1], output_path)
+        console.print(f"[green]✅ {count} hashtags compiladas em {output_path}[/green]")
+    elif len(args) >= 2 and args[0] == 'buscar':
+        lexicon = get_lexicon()
+        if lexicon is None:
+            console.print(f"[red]❌ Léxico não encontrado: {DEFAULT_LEXICON_PATH}[/red]")
+            sys.exit(1)
+        for tag, score in lexicon.prefix(args[1], limit=20):
+            console.print(f"  {tag}  [dim]{score:g}[/dim]")
+    else:
+        console.print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
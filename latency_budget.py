@@ -0,0 +1,188 @@
+"""
+Orçamento de tempo por vídeo (modo --deadline).
+Antes de cada etapa cara, estima quanto ela vai custar e, se não couber no
+tempo que resta, aplica degradações em passos definidos:
+
+    1. intervalo_maior   — frames mais espaçados na extração
+    2. menos_frames_ocr  — OCR só em parte dos frames (espalhados no vídeo)
+    3. whisper_menor     — modelo Whisper menor
+    4. sem_audio         — pula a transcrição
+
+As estimativas começam com valores típicos de CPU e são ajustadas com os
+tempos medidos nos vídeos anteriores do mesmo processo.
+"""
+
+import time
+
+# Fração do orçamento em que o OCR deve ter terminado
+OCR_SHARE = 0.6
+
+# Tempo reservado para a análise de contexto e relatórios (segundos)
+ANALYSIS_RESERVE = 0.5
+
+# Até quantas vezes o intervalo de frames pode ser dobrado
+MAX_INTERVAL_DOUBLINGS = 2
+
+# Modelos Whisper do maior para o menor
+WHISPER_LADDER = ['large', 'medium', 'small', 'base', 'tiny']
+
+# Variantes fora da escada e o degrau de tamanho equivalente (as demais,
+# como base.en e large-v3, caem no degrau do prefixo)
+WHISPER_TIERS = {'turbo': 'medium', 'large-v3-turbo': 'medium'}
+
+# Peso da medição nova na média móvel das estimativas
+_EMA_WEIGHT = 0.3
+
+# Estimativas de custo (ajustadas a cada vídeo processado)
+_costs = {
+    'ocr_frame': 1.0,  # segundos por frame
+    'whisper_rtf': {   # segundos de processamento por segundo de áudio
+        'tiny': 0.1,
+        'base': 0.25,
+        'small': 0.7,
+        'medium': 2.0,
+        'large': 4.0,
+    },
+}
+
+
+def _update(old: float, new: float) -> float:
+    """Média móvel exponencial das estimativas."""
+    return (1 - _EMA_WEIGHT) * old + _EMA_WEIGHT * new
+
+
+def whisper_tier(model_name: str) -> str:
+    """
+    Degrau de WHISPER_LADDER equivalente a um modelo Whisper.
+
+    Returns:
+        Nome do degrau ('base' para 'base.en', 'large' para 'large-v3'...),
+        ou None se o modelo for desconhecido
+    """
+    if model_name in WHISPER_TIERS:
+        return WHISPER_TIERS[model_name]
+    prefix = model_name.split('.')[0].split('-')[0]
+    return prefix if prefix in WHISPER_LADDER else None
+
+
+def subsample(frames: list, n: int) -> list:
+    """Escolhe n frames espalhados uniformemente (mantendo a ordem)."""
+    if n >= len(frames):
+        return frames
+    if n <= 0:
+        return []
+    step = len(frames) / n
+    return [frames[int(i * step)] for i in range(n)]
+
+
+class LatencyBudget:
+    """Orçamento de tempo de um vídeo e as degradações aplicadas nele."""
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.start = time.monotonic()
+        self.paused_at = None
+        self.applied = []
+
+    def elapsed(self) -> float:
+        end = self.paused_at if self.paused_at is not None else time.monotonic()
+        return end - self.start
+
+    def pause(self):
+        """Para o relógio (tempo gasto com outros vídeos, no modo em lote)."""
+        if self.paused_at is None:
+            self.paused_at = time.monotonic()
+
+    def resume(self):
+        """Volta a contar o tempo, descontando o período parado."""
+        if self.paused_at is not None:
+            self.start += time.monotonic() - self.paused_at
+            self.paused_at = None
+
+    def charge(self, seconds: float):
+        """Soma ao orçamento um tempo gasto com o relógio parado (parte do lote)."""
+        self.start -= seconds
+
+    def remaining(self) -> float:
+        return self.deadline - self.elapsed()
+
+    def _degrade(self, step: str, detail: str):
+        self.applied.append(f"{step} ({detail})")
+
+    def _ocr_time_left(self) -> float:
+        return self.deadline * OCR_SHARE - self.elapsed()
+
+    def plan_interval(self, duration: float, interval: float) -> float:
+        """
+        Escolhe o intervalo de frames para que o OCR caiba no orçamento.
+
+        Args:
+            duration: Duração do vídeo (segundos)
+            interval: Intervalo pedido (segundos)
+
+        Returns:
+            Intervalo a usar (o pedido, ou dobrado até MAX_INTERVAL_DOUBLINGS vezes)
+        """
+        available = self._ocr_time_left()
+        planned = interval
+
+        for _ in range(MAX_INTERVAL_DOUBLINGS):
+            n_frames = int(duration / planned) + 1
+            if n_frames * _costs['ocr_frame'] <= available:
+                break
+            planned *= 2
+
+        if planned != interval:
+            self._degrade('intervalo_maior', f"{interval:g}s → {planned:g}s")
+        return planned
+
+    def plan_ocr_frames(self, n_frames: int) -> int:
+        """
+        Calcula quantos frames cabem no tempo restante do OCR.
+
+        Returns:
+            Número máximo de frames a passar pelo OCR
+        """
+        allowed = max(int(self._ocr_time_left() / _costs['ocr_frame']), 0)
+        if allowed < n_frames:
+            self._degrade('menos_frames_ocr', f"{allowed}/{n_frames} frames")
+            return allowed
+        return n_frames
+
+    def plan_whisper(self, audio_seconds: float, model_name: str):
+        """
+        Escolhe o maior modelo Whisper (até o pedido) que cabe no tempo restante.
+
+        O pedido é tentado primeiro, mesmo fora da escada (base.en,
+        large-v3, turbo...); se não couber, desce pelos degraus menores que
+        o dele (whisper_tier). Modelo desconhecido não desce: ou cabe ou o
+        áudio é pulado.
+
+        Returns:
+            Nome do modelo, ou None se nem o menor couber (pular o áudio)
+        """
+        available = self.remaining() - ANALYSIS_RESERVE
+        tier = whisper_tier(model_name)
+        smaller = WHISPER_LADDER[WHISPER_LADDER.index(tier) + 1:] if tier is not None else []
+        requested_rtf = _costs['whisper_rtf'].get(model_name, _costs['whisper_rtf'].get(tier, 1.0))
+
+        for candidate in [model_name] + smaller:
+            rtf = requested_rtf if candidate == model_name else _costs['whisper_rtf'][candidate]
+            if audio_seconds * rtf <= available:
+                if candidate != model_name:
+                    self._degrade('whisper_menor', f"{model_name} → {candidate}")
+                return candidate
+
+        self._degrade('sem_audio', f"{audio_seconds:.0f}s de áudio não cabem em {max(available, 0):.1f}s")
+        return None
+
+    def record_ocr(self, n_frames: int, seconds: float):
+        """Ajusta a estimativa de custo por frame com o tempo medido."""
+        if n_frames > 0:
+            _costs['ocr_frame'] = _update(_costs['ocr_frame'], seconds / n_frames)
+
+    def record_whisper(self, model_name: str, audio_seconds: float, seconds: float):
+        """Ajusta a estimativa de custo do modelo Whisper com o tempo medido."""
+        if audio_seconds > 0:
+            rtf = _costs['whisper_rtf']
+            rtf[model_name] = _update(rtf.get(model_name, 1.0), seconds / audio_seconds)
@@ -0,0 +1,406 @@
+"""
+Cache de modelos para partida rápida.
+O primeiro vídeo de cada processo gasta muito tempo em whisper.load_model e
+easyocr.Reader, que leem, desserializam e montam os modelos do zero. O
+preparo grava os modelos já no formato final (float32, sem quantizar de
+novo):
+
+- Whisper: só os pesos (weights_only=True), abertos com mmap e ligados ao
+  modelo sem cópia. Processos na mesma máquina compartilham as mesmas
+  páginas (somente leitura) do cache de disco.
+- EasyOCR: os módulos inteiros são serializados com pickle e lidos com
+  weights_only=False. A carga é mais rápida que montar o Reader do zero,
+  mas cada processo fica com a sua cópia dos pesos (sem compartilhamento).
+
+Uso:
+    python3 -m tiktok_analyzer.model_cache preparar [--whisper base,small] [--ocr pt,en]
+    python3 -m tiktok_analyzer.model_cache benchmark [--whisper base]   # partida a frio: original x cache
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+# Pasta dos modelos preparados (pode ser trocada pela variável de ambiente)
+MODEL_CACHE_DIR = os.environ.get(
+    'TIKTOK_MODEL_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'modelos')
+)
+
+DEFAULT_OCR_LANGUAGES = ['pt', 'en']
+
+
+def _whisper_path(model_name: str) -> str:
+    return os.path.join(MODEL_CACHE_DIR, f"whisper-{model_name}.pt")
+
+
+def _easyocr_path(languages: list) -> str:
+    return os.path.join(MODEL_CACHE_DIR, f"easyocr-{'-'.join(languages)}.pt")
+
+
+def prepare_whisper(model_name: str = "base") -> str:
+    """
+    Grava o modelo Whisper no formato de carregamento rápido.
+
+    Os checkpoints oficiais vêm em float16 e são convertidos a cada
+    carregamento; aqui os pesos já ficam em float32, prontos para usar.
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    import torch
+    import whisper
+
+    model = whisper.load_model(model_name, device="cpu")
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    path = _whisper_path(model_name)
+    torch.save({'dims': vars(model.dims), 'model_state_dict': model.state_dict()}, path)
+    return path
+
+
+def _whisper_skeleton(dims):
+    """
+    Monta o Whisper sem pesos: encoder e decoder no device 'meta' (nada é
+    alocado nem inicializado) e os buffers fora do state_dict na CPU.
+
+    O Whisper.__init__ não roda inteiro no 'meta' (o to_sparse() das
+    alignment heads não tem kernel lá), então os submódulos são criados aqui.
+    """
+    import numpy as np
+    import torch
+    from whisper.model import Whisper, AudioEncoder, TextDecoder
+
+    model = Whisper.__new__(Whisper)
+    torch.nn.Module.__init__(model)
+    model.dims = dims
+    with torch.device("meta"):
+        model.encoder = AudioEncoder(
+            dims.n_mels, dims.n_audio_ctx, dims.n_audio_state, dims.n_audio_head, dims.n_audio_layer
+        )
+        model.decoder = TextDecoder(
+            dims.n_vocab, dims.n_text_ctx, dims.n_text_state, dims.n_text_head, dims.n_text_layer
+        )
+
+    n_ctx = dims.n_text_ctx
+    model.decoder.register_buffer(
+        "mask", torch.empty(n_ctx, n_ctx).fill_(-np.inf).triu_(1), persistent=False
+    )
+    heads = torch.zeros(dims.n_text_layer, dims.n_text_head, dtype=torch.bool)
+    heads[dims.n_text_layer // 2:] = True
+    model.register_buffer("alignment_heads", heads.to_sparse(), persistent=False)
+    return model
+
+
+def load_whisper(model_name: str = "base"):
+    """
+    Carrega o modelo Whisper preparado, com os pesos mapeados em memória.
+
+    O modelo é montado sem pesos (_whisper_skeleton) e recebe os tensores
+    do checkpoint diretamente (assign=True); se a montagem no 'meta' não
+    funcionar nesta versão do whisper/torch, monta normalmente na CPU e
+    ainda assim usa os tensores mapeados.
+
+    Returns:
+        Modelo Whisper, ou None se não houver cache (ou o torch for antigo)
+    """
+    path = _whisper_path(model_name)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        import torch
+        import whisper
+        from whisper.model import ModelDimensions, Whisper
+
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+        dims = ModelDimensions(**checkpoint['dims'])
+        try:
+            model = _whisper_skeleton(dims)
+        except Exception:
+            model = Whisper(dims)
+        model.load_state_dict(checkpoint['model_state_dict'], assign=True)
+
+        if model_name in whisper._ALIGNMENT_HEADS:
+            model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+
+        tensors = list(model.parameters()) + list(model.buffers())
+        if any(tensor.is_meta for tensor in tensors):
+            raise RuntimeError("tensores sem dados no checkpoint")
+
+        return model.eval()
+
+    except Exception as e:
+        console.print(f"  [yellow]⚠️ Cache do Whisper ignorado ({e})[/yellow]")
+        return None
+
+
+def prepare_easyocr(languages: list = None) -> str:
+    """
+    Grava detector, reconhecedor e conversor do EasyOCR já montados (e
+    quantizados, como o EasyOCR faz na CPU).
+
+    Returns:
+        Caminho do arquivo gravado
+    """
+    import torch
+    import easyocr
+
+    languages = languages or DEFAULT_OCR_LANGUAGES
+    reader = easyocr.Reader(languages, gpu=False, verbose=False)
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+    path = _easyocr_path(languages)
+    torch.save({
+        'detect_network': reader.detect_network,
+        'detector': reader.detector,
+        'recognizer': reader.recognizer,
+        'converter': reader.converter,
+    }, path)
+    return path
+
+
+def _sample_text_image():
+    """Imagem com uma palavra desenhada (para testar e aquecer o OCR)."""
+    import cv2
+    import numpy as np
+
+    image = np.full((96, 320, 3), 255, dtype=np.uint8)
+    cv2.putText(image, "teste", (30, 65), cv2.FONT_HERSHEY_SIMPLEX, 1.8, (0, 0, 0), 4)
+    return image
+
+
+def load_easyocr(languages: list = None):
+    """
+    Cria o easyocr.Reader com os modelos do cache (módulos serializados
+    inteiros, sem compartilhar páginas entre processos).
+
+    Returns:
+        Reader pronto, ou None se não houver cache
+    """
+    languages = languages or DEFAULT_OCR_LANGUAGES
+    path = _easyocr_path(languages)
+    if not os.path.exists(path):
+        return None
+
+    try:
+        import torch
+        import easyocr
+
+        # Módulos inteiros (não só pesos): o arquivo é gerado localmente pelo preparar
+        checkpoint = torch.load(path, map_location="cpu", mmap=True, weights_only=False)
+        reader = easyocr.Reader(languages, gpu=False, verbose=False, detector=False, recognizer=False)
+
+        # Com detector=False o Reader não define as funções do detector
+        # (getDetectorPath faria isso, mas recalcula o MD5 do modelo)
+        network = checkpoint.get('detect_network', 'craft')
+        if network == 'dbnet18':
+            from easyocr.detection_db import get_detector, get_textbox
+        else:
+            from easyocr.detection import get_detector, get_textbox
+        reader.detect_network = network
+        reader.get_detector = get_detector
+        reader.get_textbox = get_textbox
+
+        reader.detector = checkpoint['detector'].eval()
+        reader.recognizer = checkpoint['recognizer'].eval()
+        reader.converter = checkpoint['converter']
+
+        # Confere o leitor montado lendo uma palavra (um erro aqui viraria
+        # OCR vazio em todos os vídeos, já que _read_frame engole exceções)
+        if not reader.readtext(_sample_text_image()):
+            raise RuntimeError("leitura de teste vazia")
+        return reader
+
+    except Exception as e:
+        console.print(f"  [yellow]⚠️ Cache do EasyOCR ignorado ({e})[/yellow]")
+        return None
+
+
+def prepare_models(whisper_models: list = None, ocr_languages: list = None) -> list:
+    """
+    Prepara os modelos para carregamento rápido.
+
+    Args:
+        whisper_models: Modelos Whisper a preparar (padrão: ['base'])
+        ocr_languages: Idiomas do EasyOCR (padrão: pt, en)
+
+    Returns:
+        Caminhos dos arquivos gravados
+    """
+    paths = []
+    for model_name in whisper_models or ['base']:
+        console.print(f"  🧠 Preparando Whisper '{model_name}'...")
+        paths.append(prepare_whisper(model_name))
+
+    console.print("  🔤 Preparando EasyOCR...")
+    paths.append(prepare_easyocr(ocr_languages))
+    return paths
+
+
+def warm_up(whisper_model: str = None, ocr_engine: str = None):
+    """
+    Carrega os modelos e roda uma inferência descartável em cada um.
+
+    A primeira inferência paga a alocação dos buffers e a escolha dos
+    kernels do torch; chamada na partida do processo, deixa o primeiro
+    vídeo com o mesmo tempo dos seguintes.
+
+    Args:
+        whisper_model: Modelo Whisper a aquecer (None = não aquece)
+        ocr_engine: Motor de OCR a aquecer (None = não aquece)
+    """
+    if ocr_engine:
+        from tiktok_analyzer.ocr_engines import get_engine
+
+        # Uma palavra desenhada, para o reconhecedor também rodar
+        get_engine(ocr_engine).readtext(_sample_text_image())
+
+    if whisper_model:
+        import numpy as np
+        import whisper
+        from tiktok_analyzer.audio_transcriber import _get_model
+
+        model = _get_model(whisper_model)
+        n_mels = getattr(model.dims, 'n_mels', 80)
+        mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(np.zeros(16000, dtype=np.float32)), n_mels)
+        options = whisper.DecodingOptions(
+            language="pt" if model.is_multilingual else "en",
+            without_timestamps=True, sample_len=4, fp16=False
+        )
+        whisper.decode(model, mel.unsqueeze(0).to(model.device), options)
+
+
+def _memory() -> dict:
+    """Memória do processo em MB (VmRSS, RssAnon e RssFile de /proc/self/status)."""
+    memory = {}
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in ('VmRSS', 'RssAnon', 'RssFile'):
+                    memory[key] = int(value.split()[0]) / 1024
+    except OSError:
+        pass
+    return memory
+
+
+def _cold_start(whisper_model: str) -> dict:
+    """Mede uma partida a frio neste processo (chamado pelo benchmark em um processo novo)."""
+    start = time.monotonic()
+    from tiktok_analyzer.audio_transcriber import _get_model
+    from tiktok_analyzer.ocr_engines import get_engine
+    imported = time.monotonic()
+
+    _get_model(whisper_model)
+    get_engine('easyocr')
+    loaded = time.monotonic()
+
+    warm_up(whisper_model, 'easyocr')
+    warmed = time.monotonic()
+
+    return dict(_memory(), imports=imported - start, load=loaded - imported, warm_up=warmed - loaded)
+
+
+def benchmark(whisper_model: str = "base", runs: int = 2) -> dict:
+    """
+    Compara a partida a frio com e sem o cache, cada uma em processos novos.
+
+    Cada modo roda `runs` vezes e vale a última medição (com o cache de
+    disco do sistema já quente, como em workers que sobem na mesma máquina).
+
+    Returns:
+        Dict {'original': medições, 'cache': medições}
+    """
+    if not (os.path.exists(_whisper_path(whisper_model)) and os.path.exists(_easyocr_path(DEFAULT_OCR_LANGUAGES))):
+        raise FileNotFoundError(f"Modelos não preparados em {MODEL_CACHE_DIR} (rode 'preparar' antes)")
+
+    report = {}
+    with tempfile.TemporaryDirectory() as empty_dir:
+        for mode, cache_dir in (('original', empty_dir), ('cache', MODEL_CACHE_DIR)):
+            env = dict(os.environ, TIKTOK_MODEL_CACHE=cache_dir)
+            for _ in range(runs):
+                output = subprocess.run(
+                    [sys.executable, '-m', 'tiktok_analyzer.model_cache', '_partida', whisper_model],
+                    capture_output=True, text=True, env=env
+                )
+                try:
+                    report[mode] = json.loads(output.stdout.strip().splitlines()[-1])
+                except (IndexError, ValueError):
+                    errors = output.stderr.strip().splitlines()
+                    report[mode] = {'error': errors[-1] if errors else "falhou"}
+    return report
+
+
+def _show_benchmark(report: dict):
+    """Mostra o resultado do benchmark como tabela."""
+    table = Table(title="🧊 Partida a frio", box=box.ROUNDED, border_style="cyan", title_style="bold white")
+    table.add_column("Modo")
+    table.add_column("Imports", style="dim")
+    table.add_column("Carregar modelos", style="blue")
+    table.add_column("Aquecimento", style="blue")
+    table.add_column("RSS", style="magenta")
+    table.add_column("RSS anônima", style="magenta")
+
+    for mode, row in report.items():
+        if 'error' in row:
+            table.add_row(mode, f"[red]{row['error']}[/red]", "", "", "", "")
+            continue
+        table.add_row(
+            mode, f"{row['imports']:.2f}s", f"{row['load']:.2f}s", f"{row['warm_up']:.2f}s",
+            f"{row.get('VmRSS', 0):.0f} MB", f"{row.get('RssAnon', 0):.0f} MB",
+        )
+
+    console.print(table)
+
+
+def main():
+    """CLI de preparo e benchmark dos modelos."""
+    args = sys.argv[1:]
+    if not args:
+        console.print(__doc__)
+        sys.exit(1)
+
+    command, params = args[0], args[1:]
+
+    if command == '_partida':
+        # Uso interno do benchmark: uma medição em processo novo (JSON na última linha)
+        console.quiet = True
+        print(json.dumps(_cold_start(params[0])))
+        return
+
+    whisper_models = ['base']
+    ocr_languages = None
+    i = 0
+    while i < len(params):
+        if params[i] == '--whisper' and i + 1 < len(params):
+            whisper_models = params[i + 1].split(',')
+            i += 2
+        elif params[i] == '--ocr' and i + 1 < len(params):
+            ocr_languages = params[i + 1].split(',')
+            i += 2
+        else:
+            i += 1
+
+    if command == 'preparar':
+        for path in prepare_models(whisper_models, ocr_languages):
+            console.print(f"  💾 {path}")
+    elif command == 'benchmark':
+        try:
+            _show_benchmark(benchmark(whisper_models[0]))
+        except FileNotFoundError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            sys.exit(1)
+    else:
+        console.print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
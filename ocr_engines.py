@@ -0,0 +1,236 @@
+"""
+Motores de OCR intercambiáveis.
+Define a interface comum dos motores (EasyOCR, Tesseract, ONNX Runtime) e o
+modo cascata, em que um motor rápido roda primeiro e só o que ficou com
+baixa confiança é reprocessado pelo EasyOCR.
+"""
+
+import cv2
+from rich.console import Console
+
+from tiktok_analyzer.model_cache import load_easyocr
+from tiktok_analyzer.text_prefilter import text_likelihood, DEFAULT_THRESHOLD
+
+console = Console()
+
+# Motores já inicializados (um por nome, por processo)
+_engines = {}
+
+
+class OCREngine:
+    """
+    Interface de um motor de OCR.
+
+    readtext() recebe um frame BGR (numpy array) e retorna uma lista de
+    (bbox, texto, confiança, motor), onde bbox são os 4 cantos da região
+    e motor é o nome de quem produziu aquele resultado.
+    """
+
+    name = "base"
+
+    def readtext(self, image) -> list:
+        raise NotImplementedError
+
+
+class EasyOCREngine(OCREngine):
+    """Motor EasyOCR (mais preciso, mais lento em CPU)."""
+
+    name = "easyocr"
+
+    def __init__(self, languages: list = None):
+        # Modelos preparados por model_cache abrem com mmap, sem remontar
+        self.reader = load_easyocr(languages)
+        if self.reader is not None:
+            return
+
+        import easyocr
+
+        console.print("  🔤 Inicializando modelo OCR (primeira vez pode demorar)...")
+        self.reader = easyocr.Reader(
+            languages or ['pt', 'en'],
+            gpu=False,
+            verbose=False
+        )
+
+    def readtext(self, image) -> list:
+        return [(bbox, text, confidence, self.name)
+                for bbox, text, confidence in self.reader.readtext(image)]
+
+
+class TesseractEngine(OCREngine):
+    """Motor Tesseract via pytesseract (rápido, bom para legendas limpas)."""
+
+    name = "tesseract"
+
+    def __init__(self, languages: str = "por+eng"):
+        import pytesseract
+
+        # Sem o binário ou os idiomas, cada frame falharia e o OCR sairia
+        # vazio sem aviso (os erros por frame são silenciados)
+        try:
+            pytesseract.get_tesseract_version()
+            available = set(pytesseract.get_languages(config=''))
+        except pytesseract.TesseractNotFoundError:
+            raise RuntimeError("Tesseract não encontrado (instale o pacote tesseract-ocr)")
+        missing = [lang for lang in languages.split('+') if lang not in available]
+        if missing:
+            raise RuntimeError(f"Idiomas do Tesseract não instalados: {', '.join(missing)} "
+                               f"(instale tesseract-ocr-{missing[0]})")
+
+        self.pytesseract = pytesseract
+        self.languages = languages
+
+    def readtext(self, image) -> list:
+        rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        data = self.pytesseract.image_to_data(
+            rgb,
+            lang=self.languages,
+            output_type=self.pytesseract.Output.DICT
+        )
+
+        # O Tesseract retorna palavras; agrupa por linha como o EasyOCR
+        lines = {}
+        for i, word in enumerate(data['text']):
+            confidence = float(data['conf'][i])
+            if not word.strip() or confidence < 0:
+                continue
+
+            key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+            lines.setdefault(key, []).append((
+                word,
+                confidence / 100.0,
+                data['left'][i], data['top'][i],
+                data['left'][i] + data['width'][i], data['top'][i] + data['height'][i],
+            ))
+
+        results = []
+        for words in lines.values():
+            text = " ".join(w[0] for w in words)
+            confidence = sum(w[1] for w in words) / len(words)
+            x1 = min(w[2] for w in words)
+            y1 = min(w[3] for w in words)
+            x2 = max(w[4] for w in words)
+            y2 = max(w[5] for w in words)
+            bbox = [[x1, y1], [x2, y1], [x2, y2], [x1, y2]]
+            results.append((bbox, text, confidence, self.name))
+
+        return results
+
+
+class OnnxOCREngine(OCREngine):
+    """Motor ONNX Runtime via RapidOCR (modelos PaddleOCR exportados para ONNX)."""
+
+    name = "onnx"
+
+    def __init__(self):
+        from rapidocr_onnxruntime import RapidOCR
+
+        self.engine = RapidOCR()
+
+    def readtext(self, image) -> list:
+        results, _ = self.engine(image)
+        return [(bbox, text, float(confidence), self.name)
+                for bbox, text, confidence in (results or [])]
+
+
+class CascadeEngine(OCREngine):
+    """
+    Cascata: um motor rápido roda primeiro e só escala o que precisa.
+
+    Regiões com confiança abaixo de `threshold` são recortadas e relidas
+    pelo motor preciso. Frames em que o motor rápido não achou nada só são
+    relidos inteiros se o pré-filtro de texto indicar texto (o motor rápido
+    pode ter perdido texto estilizado); os sem texto não pagam o EasyOCR.
+    """
+
+    def __init__(self, fast: OCREngine, accurate: OCREngine, threshold: float = 0.6,
+                 padding: int = 8, text_threshold: float = DEFAULT_THRESHOLD):
+        self.fast = fast
+        self.accurate = accurate
+        self.threshold = threshold
+        self.padding = padding
+        self.text_threshold = text_threshold
+        self.name = f"cascata({fast.name}>{accurate.name})"
+
+    def readtext(self, image) -> list:
+        try:
+            fast_results = self.fast.readtext(image)
+        except Exception:
+            # Motor rápido falhou neste frame: o preciso lê o frame inteiro
+            return self.accurate.readtext(image)
+        if not fast_results:
+            if text_likelihood(image) < self.text_threshold:
+                return []
+            return self.accurate.readtext(image)
+
+        height, width = image.shape[:2]
+        results = []
+
+        for result in fast_results:
+            bbox, text, confidence, engine = result
+            if confidence >= self.threshold:
+                results.append(result)
+                continue
+
+            # Recorta só a região duvidosa (com margem) e relê com o motor preciso
+            xs = [int(p[0]) for p in bbox]
+            ys = [int(p[1]) for p in bbox]
+            x1 = max(min(xs) - self.padding, 0)
+            y1 = max(min(ys) - self.padding, 0)
+            x2 = min(max(xs) + self.padding, width)
+            y2 = min(max(ys) + self.padding, height)
+
+            if x2 <= x1 or y2 <= y1:
+                results.append(result)
+                continue
+
+            region_results = self.accurate.readtext(image[y1:y2, x1:x2])
+            if not region_results:
+                results.append(result)
+                continue
+
+            for region_bbox, region_text, region_confidence, region_engine in region_results:
+                shifted = [[p[0] + x1, p[1] + y1] for p in region_bbox]
+                results.append((shifted, region_text, region_confidence, region_engine))
+
+        return results
+
+
+# Fábricas dos motores disponíveis (nome -> função sem argumentos)
+ENGINES = {
+    'easyocr': EasyOCREngine,
+    'tesseract': TesseractEngine,
+    'onnx': OnnxOCREngine,
+}
+
+
+def register_engine(name: str, factory):
+    """Registra um novo motor de OCR (factory: função que cria o motor)."""
+    ENGINES[name] = factory
+
+
+def get_engine(name: str = 'easyocr') -> OCREngine:
+    """
+    Retorna o motor de OCR pelo nome (inicializa na primeira chamada).
+
+    Args:
+        name: Nome do motor ('easyocr', 'tesseract', 'onnx'), ou 'cascata'
+              / 'cascata:<motor rápido>' para a cascata com o EasyOCR
+              (padrão do motor rápido: tesseract)
+
+    Returns:
+        Instância do motor
+    """
+    if name in _engines:
+        return _engines[name]
+
+    if name == 'cascata' or name.startswith('cascata:'):
+        fast_name = name.partition(':')[2] or 'tesseract'
+        engine = CascadeEngine(get_engine(fast_name), get_engine('easyocr'))
+    elif name in ENGINES:
+        engine = ENGINES[name]()
+    else:
+        raise ValueError(f"Motor de OCR desconhecido: {name}")
+
+    _engines[name] = engine
+    return engine
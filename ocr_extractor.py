@@ -1,68 +1,388 @@
 """
 Módulo de extração de texto via OCR.
-Usa EasyOCR para ler textos que aparecem nos frames dos vídeos.
+Lê os textos que aparecem nos frames dos vídeos com o motor de OCR escolhido
+(EasyOCR por padrão; veja ocr_engines).
 """
 
-import easyocr
+import os
+import atexit
+import queue
+import threading
+import multiprocessing
+from collections import deque
+from multiprocessing import shared_memory
+
+import numpy as np
 from rich.console import Console
 
+from tiktok_analyzer.ocr_engines import get_engine
+from tiktok_analyzer.text_prefilter import filter_frames, text_likelihood
+from tiktok_analyzer.video_processor import open_video, read_frame_at
+
 console = Console()
 
-# Inicializa o leitor OCR uma vez (singleton)
-_reader = None
+# Pool de processos OCR (inicializado sob demanda, mantido entre vídeos)
+_pool = None
+_pool_lock = threading.Lock()
 
 
-def _get_reader():
-    """Retorna o leitor EasyOCR (inicializa na primeira chamada)."""
-    global _reader
-    if _reader is None:
-        console.print("  🔤 Inicializando modelo OCR (primeira vez pode demorar)...")
-        _reader = easyocr.Reader(
-            ['pt', 'en'],
-            gpu=False,
-            verbose=False
-        )
-    return _reader
+def _normalize(text: str) -> str:
+    """Normaliza o texto para deduplicação."""
+    return text.strip().lower()
 
 
-def extract_text_from_frames(frames: list, confidence_threshold: float = 0.3) -> list:
+def _read_frame(engine, frame, confidence_threshold: float) -> list:
+    """
+    Roda o OCR em um único frame.
+    
+    Returns:
+        Lista de (texto, motor) aceitos no frame (sem deduplicação)
+    """
+    texts = []
+    
+    try:
+        results = engine.readtext(frame)
+    except Exception:
+        # Silencia erros de frames individuais
+        return texts
+    
+    for (bbox, text, confidence, engine_name) in results:
+        if confidence >= confidence_threshold:
+            # Ignora textos muito curtos (provavelmente ruído)
+            if len(_normalize(text)) < 2:
+                continue
+            texts.append((text.strip(), engine_name))
+    
+    return texts
+
+
+def _merge_texts(per_frame_texts: list) -> list:
+    """
+    Junta os textos de vários frames (em ordem), removendo repetidos.
+    
+    Args:
+        per_frame_texts: Lista com a lista de (texto, motor) de cada frame
+    
+    Returns:
+        Lista de (texto, motor) únicos, na ordem em que apareceram
+    """
+    all_texts = []
+    seen_texts = set()
+    
+    for texts in per_frame_texts:
+        for text, engine_name in texts:
+            normalized = _normalize(text)
+            if normalized not in seen_texts:
+                seen_texts.add(normalized)
+                all_texts.append((text, engine_name))
+    
+    return all_texts
+
+
+def _finish(all_texts: list, with_engines: bool) -> list:
+    """Mostra o total e formata a saída (só textos, ou (texto, motor))."""
+    console.print(f"  🔍 {len(all_texts)} textos únicos encontrados via OCR")
+    if with_engines:
+        return all_texts
+    return [text for text, _ in all_texts]
+
+
+def _attach_shared_memory(name: str):
+    """Abre um bloco de memória compartilhada criado por outro processo."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: os workers 'spawn' usam o resource_tracker do
+        # processo principal, então registrar de novo é inofensivo; só o
+        # processo principal remove o bloco (e o tracker ainda o limpa se
+        # ele morrer)
+        return shared_memory.SharedMemory(name=name)
+
+
+def _ocr_worker(tasks, results, torch_threads: int):
+    """
+    Loop de um processo OCR do pool.
+    
+    Cada worker mantém o próprio motor de OCR carregado e lê os frames
+    direto do ring buffer em memória compartilhada, sem pickle dos arrays.
+    """
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    
+    shm = None
+    
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        
+        shm_name, slot, slot_size, index, shape, confidence_threshold, engine_name = task
+        if shm is None or shm.name != shm_name:
+            if shm is not None:
+                shm.close()
+            shm = _attach_shared_memory(shm_name)
+        
+        frame = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf, offset=slot * slot_size)
+        texts = _read_frame(get_engine(engine_name), frame, confidence_threshold)
+        del frame
+        
+        results.put((slot, index, texts))
+    
+    if shm is not None:
+        shm.close()
+
+
+def _get_pool(workers: int) -> dict:
+    """Retorna o pool de processos OCR com `workers` processos (cria se preciso)."""
+    global _pool
+    if _pool is not None and len(_pool['processes']) == workers:
+        return _pool
+    
+    _shutdown_pool()
+    console.print(f"  🔤 Iniciando {workers} processos OCR...")
+    
+    # 'spawn' evita herdar o estado do torch/OpenMP do processo principal
+    ctx = multiprocessing.get_context('spawn')
+    tasks = ctx.Queue()
+    results = ctx.Queue()
+    torch_threads = max(1, (os.cpu_count() or 1) // workers)
+    
+    processes = []
+    for _ in range(workers):
+        proc = ctx.Process(target=_ocr_worker, args=(tasks, results, torch_threads), daemon=True)
+        proc.start()
+        processes.append(proc)
+    
+    _pool = {'processes': processes, 'tasks': tasks, 'results': results}
+    return _pool
+
+
+def _shutdown_pool(terminate: bool = False):
+    """
+    Encerra o pool de processos OCR, se existir.
+    
+    Args:
+        terminate: Mata os processos na hora, sem esperar as tarefas na fila
+                   (usado depois de um erro, quando elas já não interessam)
+    """
+    global _pool
+    if _pool is None:
+        return
+    
+    if terminate:
+        for proc in _pool['processes']:
+            proc.terminate()
+    else:
+        for _ in _pool['processes']:
+            _pool['tasks'].put(None)
+    for proc in _pool['processes']:
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+    _pool = None
+
+
+atexit.register(_shutdown_pool)
+
+
+def _read_frames_parallel(frames: list, confidence_threshold: float, workers: int,
+                          engine_name: str, cancel=None) -> list:
+    """
+    Distribui os frames entre os processos OCR via ring buffer compartilhado.
+    
+    O ring tem 2 slots por worker: enquanto um frame é lido, o próximo já
+    está copiado e esperando. Um slot só é reutilizado depois que o worker
+    devolve o resultado do frame que estava nele. Se `cancel` for
+    acionado, para de enviar frames e só espera os que já estão no pool.
+    
+    Returns:
+        Lista com a lista de (texto, motor) de cada frame, na ordem original
+        (frames não lidos por cancelamento ficam com lista vazia)
+    """
+    with _pool_lock:
+        pool = _get_pool(workers)
+        
+        n_slots = 2 * workers
+        slot_size = max(frame.nbytes for frame in frames)
+        shm = shared_memory.SharedMemory(create=True, size=slot_size * n_slots)
+        
+        per_frame_texts = [[] for _ in frames]
+        free_slots = deque(range(n_slots))
+        next_index = 0
+        pending = 0
+        
+        try:
+            while next_index < len(frames) or pending:
+                if cancel is not None and cancel.is_set():
+                    next_index = len(frames)
+                while free_slots and next_index < len(frames):
+                    slot = free_slots.popleft()
+                    frame = np.ascontiguousarray(frames[next_index], dtype=np.uint8)
+                    slot_view = np.ndarray(frame.shape, dtype=np.uint8, buffer=shm.buf,
+                                           offset=slot * slot_size)
+                    slot_view[...] = frame
+                    del slot_view
+                    
+                    pool['tasks'].put((shm.name, slot, slot_size, next_index,
+                                       frame.shape, confidence_threshold, engine_name))
+                    next_index += 1
+                    pending += 1
+                
+                try:
+                    slot, index, texts = pool['results'].get(timeout=5)
+                except queue.Empty:
+                    if not all(proc.is_alive() for proc in pool['processes']):
+                        raise RuntimeError("um processo OCR terminou inesperadamente")
+                    continue
+                
+                per_frame_texts[index] = texts
+                free_slots.append(slot)
+                pending -= 1
+        except BaseException:
+            # Tarefas e resultados pendentes ficariam na fila e seriam lidos
+            # pelo próximo vídeo: descarta o pool inteiro
+            _shutdown_pool(terminate=True)
+            raise
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    return per_frame_texts
+
+
+def extract_text_from_frames(frames: list, confidence_threshold: float = 0.3, workers: int = 1,
+                             engine: str = 'easyocr', with_engines: bool = False,
+                             prefilter: float = None, cancel=None) -> list:
     """
     Extrai texto de uma lista de frames usando OCR.
     
     Args:
         frames: Lista de frames (imagens numpy array)
         confidence_threshold: Confiança mínima para aceitar texto (0-1)
+        workers: Número de processos OCR em paralelo (1 = no próprio processo)
+        engine: Motor de OCR (veja ocr_engines.get_engine)
+        with_engines: Se True, retorna (texto, motor que o produziu)
+        prefilter: Limiar do pré-filtro de texto (veja text_prefilter);
+                   frames abaixo dele pulam o OCR. None = OCR em todos
+        cancel: threading.Event; quando acionado, para entre um frame e
+                outro e retorna o que já foi lido
     
     Returns:
         Lista de textos únicos encontrados
     """
-    reader = _get_reader()
-    all_texts = []
+    if prefilter is not None and frames:
+        total = len(frames)
+        frames, skipped = filter_frames(frames, prefilter)
+        console.print(f"  ⏭️ {skipped}/{total} frames sem texto pulados ({skipped / total:.0%})")
+    
+    if workers > 1 and len(frames) > 1:
+        per_frame_texts = _read_frames_parallel(frames, confidence_threshold, workers, engine, cancel)
+    else:
+        ocr_engine = get_engine(engine)
+        per_frame_texts = []
+        for frame in frames:
+            if cancel is not None and cancel.is_set():
+                break
+            per_frame_texts.append(_read_frame(ocr_engine, frame, confidence_threshold))
+    
+    return _finish(_merge_texts(per_frame_texts), with_engines)
+
+
+def extract_text_adaptive(video_path: str, coarse_interval: float = 4.0,
+                          min_interval: float = 0.5, confidence_threshold: float = 0.3,
+                          engine: str = 'easyocr', with_engines: bool = False,
+                          prefilter: float = None, cancel=None) -> list:
+    """
+    Extrai texto do vídeo com amostragem adaptativa de frames.
+    
+    Começa com uma amostragem grossa (um frame a cada `coarse_interval`
+    segundos) e só refina os trechos entre dois frames cujo OCR deu
+    resultados diferentes, pegando o frame do meio. Um trecho para de ser
+    refinado quando o frame do meio não traz nenhum texto novo, ou quando
+    o espaçamento chegaria abaixo de `min_interval`.
+    
+    Args:
+        video_path: Caminho do arquivo de vídeo
+        coarse_interval: Intervalo inicial entre frames (segundos)
+        min_interval: Menor intervalo permitido no refinamento (segundos)
+        confidence_threshold: Confiança mínima para aceitar texto (0-1)
+        engine: Motor de OCR (veja ocr_engines.get_engine)
+        with_engines: Se True, retorna (texto, motor que o produziu)
+        prefilter: Limiar do pré-filtro de texto (None = OCR em todos os frames)
+        cancel: threading.Event; quando acionado, para de amostrar frames
+    
+    Returns:
+        Lista de textos únicos encontrados, em ordem de aparição no vídeo
+    """
+    cap, fps, duration = open_video(video_path)
+    if cap is None:
+        return []
+    
+    ocr_engine = get_engine(engine)
+    frame_texts = {}  # instante -> textos aceitos
+    frame_keys = {}   # instante -> conjunto de textos normalizados
     seen_texts = set()
+    skipped = [0]
     
-    for i, frame in enumerate(frames):
-        try:
-            results = reader.readtext(frame)
-            
-            for (bbox, text, confidence) in results:
-                if confidence >= confidence_threshold:
-                    # Normaliza o texto para deduplicação
-                    normalized = text.strip().lower()
-                    
-                    # Ignora textos muito curtos (provavelmente ruído)
-                    if len(normalized) < 2:
-                        continue
-                    
-                    if normalized not in seen_texts:
-                        seen_texts.add(normalized)
-                        all_texts.append(text.strip())
+    def sample(timestamp: float) -> set:
+        """Faz OCR no instante dado e retorna os textos inéditos."""
+        if cancel is not None and cancel.is_set():
+            frame_texts[timestamp] = []
+            frame_keys[timestamp] = set()
+            return set()
+        frame = read_frame_at(cap, timestamp, fps)
+        if frame is not None and prefilter is not None and text_likelihood(frame) < prefilter:
+            skipped[0] += 1
+            frame = None
+        texts = _read_frame(ocr_engine, frame, confidence_threshold) if frame is not None else []
+        keys = {_normalize(text) for text, _ in texts}
         
-        except Exception as e:
-            # Silencia erros de frames individuais
+        frame_texts[timestamp] = texts
+        frame_keys[timestamp] = keys
+        
+        new_texts = keys - seen_texts
+        seen_texts.update(new_texts)
+        return new_texts
+    
+    # 1. Amostragem grossa
+    timestamps = []
+    t = 0.0
+    while t < duration or not timestamps:
+        timestamps.append(t)
+        t += coarse_interval
+    
+    for t in timestamps:
+        sample(t)
+    
+    # 2. Refina só os trechos onde o texto mudou
+    spans = [(a, b) for a, b in zip(timestamps, timestamps[1:])
+             if frame_keys[a] != frame_keys[b]]
+    
+    while spans:
+        start, end = spans.pop()
+        if (end - start) / 2 < min_interval:
+            continue
+        
+        middle = (start + end) / 2
+        if not sample(middle):
+            # Nada novo no meio do trecho: para de refinar aqui
             continue
+        
+        for a, b in ((start, middle), (middle, end)):
+            if frame_keys[a] != frame_keys[b]:
+                spans.append((a, b))
     
-    console.print(f"  🔍 {len(all_texts)} textos únicos encontrados via OCR")
-    return all_texts
+    cap.release()
+    
+    all_texts = _merge_texts([frame_texts[t] for t in sorted(frame_texts)])
+    
+    console.print(f"  📸 {len(frame_texts)} frames analisados (amostragem adaptativa, {duration:.1f}s de vídeo)")
+    if prefilter is not None:
+        console.print(f"  ⏭️ {skipped[0]}/{len(frame_texts)} frames sem texto pulados")
+    return _finish(all_texts, with_engines)
 
 
 def texts_to_string(texts: list) -> str:
@@ -0,0 +1,442 @@
+"""
+Pipeline de análise de um vídeo, em etapas independentes.
+Cada etapa recebe e atualiza o mesmo dict de estado do vídeo, para que
+possam ser chamadas em sequência (analyze_video, CLI) ou em executores
+diferentes (async_api).
+
+    1. ingest_stage         — frames + áudio (ffmpeg, ou OpenCV/MoviePy)
+    2. ocr_stage            — texto dos frames
+    3. transcription_stage  — fala do áudio (Whisper); batch_transcription_stage
+                              faz o mesmo para vários vídeos em um lote
+    4. analysis_stage       — palavras-chave, categorias, hashtags e descrição
+"""
+
+import os
+import time
+import threading
+from collections import Counter
+
+from tiktok_analyzer import (
+    video_processor, ocr_extractor, ocr_engines, text_prefilter, audio_transcriber,
+    context_analyzer, hashtag_lexicon, fingerprint, model_cache,
+)
+from tiktok_analyzer.video_processor import (
+    extract_frames, extract_audio, demux_video, probe_video, AUDIO_SAMPLE_RATE,
+)
+from tiktok_analyzer.ocr_extractor import extract_text_from_frames, extract_text_adaptive, texts_to_string
+from tiktok_analyzer.audio_transcriber import transcribe_audio, transcribe_batch, cleanup_audio
+from tiktok_analyzer.context_analyzer import analyze_content
+from tiktok_analyzer.latency_budget import LatencyBudget, subsample
+from tiktok_analyzer.fingerprint import compute_fingerprint, open_index, find_match, add_fingerprint
+
+# Configuração padrão da análise (as mesmas opções da CLI)
+DEFAULT_CONFIG = {
+    'frame_interval': 2.0,     # segundos entre frames
+    'adaptive': False,         # amostragem adaptativa de frames
+    'ocr_workers': 1,          # processos OCR em paralelo
+    'ocr_engine': 'easyocr',   # motor de OCR (veja ocr_engines)
+    'prefilter': None,         # limiar do pré-filtro de texto (None = desligado)
+    'whisper_model': 'base',   # modelo Whisper
+    'deadline': None,          # orçamento de tempo por vídeo (segundos)
+    'fingerprint_index': None, # índice de impressões para reaproveitar vídeos repetidos (None = desligado)
+}
+
+EMPTY_TRANSCRIPTION = {"text": "", "language": "unknown", "segments": []}
+
+
+class AnalysisCancelled(Exception):
+    """A análise do vídeo foi cancelada (ex.: timeout da async_api)."""
+
+
+def make_config(config: dict = None, **overrides) -> dict:
+    """Completa uma configuração parcial com os valores padrão."""
+    merged = dict(DEFAULT_CONFIG)
+    merged.update(config or {})
+    merged.update(overrides)
+    return merged
+
+
+# Quantos chamadores pediram silêncio (os consoles são globais do processo)
+_quiet_lock = threading.Lock()
+_quiet_depth = 0
+
+
+def set_quiet(quiet: bool = True):
+    """
+    Liga/desliga as mensagens de console de todos os módulos da análise.
+
+    As chamadas se aninham: cada set_quiet(True) precisa do seu
+    set_quiet(False), e o console só volta a falar quando o último
+    chamador que pediu silêncio terminar (por exemplo, duas chamadas
+    concorrentes de async_api.analyze_videos).
+    """
+    global _quiet_depth
+    with _quiet_lock:
+        _quiet_depth = _quiet_depth + 1 if quiet else max(0, _quiet_depth - 1)
+        for module in (video_processor, ocr_extractor, ocr_engines, text_prefilter, audio_transcriber,
+                       context_analyzer, hashtag_lexicon, fingerprint, model_cache):
+            module.console.quiet = _quiet_depth > 0
+
+
+def start_video(video_path: str, config: dict = None, info: dict = None) -> dict:
+    """
+    Cria o estado de análise de um vídeo.
+
+    Args:
+        video_path: Caminho completo do vídeo
+        config: Opções da análise (veja DEFAULT_CONFIG)
+        info: Metadados já lidos pelo agendador (probe_video), para a
+              ingestão não rodar o ffprobe de novo
+
+    Returns:
+        Dict de estado, atualizado pelas etapas; state['cancel'] é um
+        threading.Event que, acionado, interrompe a análise entre frames
+        do OCR e entre etapas
+    """
+    config = make_config(config)
+    return {
+        'video_path': video_path,
+        'config': config,
+        'budget': LatencyBudget(config['deadline']) if config['deadline'] else None,
+        'info': info,
+        'cancel': threading.Event(),
+        'frames': None,
+        'audio': None,
+        'ocr_entries': [],
+        'transcription': EMPTY_TRANSCRIPTION,
+        'fingerprint': None,
+        'reused': None,
+    }
+
+
+def _check_cancelled(state: dict):
+    """Interrompe a análise se ela foi cancelada."""
+    if state['cancel'].is_set():
+        _release_audio(state)
+        state['frames'] = None
+        raise AnalysisCancelled(os.path.basename(state['video_path']))
+
+
+def ingest_stage(state: dict):
+    """
+    Etapa 1: extrai frames e áudio em uma única passada do ffmpeg.
+    No modo adaptativo só o áudio é extraído (o OCR lê os frames sob demanda).
+
+    Com o índice de impressões ligado, procura um vídeo quase igual já
+    analisado; se achar, as etapas seguintes reaproveitam o resultado dele.
+    """
+    _check_cancelled(state)
+    video_path = state['video_path']
+    config = state['config']
+    budget = state['budget']
+    adaptive = config['adaptive']
+    frame_interval = config['frame_interval']
+
+    info = state['info'] or probe_video(video_path)
+    if budget is not None and info is not None and not adaptive:
+        frame_interval = budget.plan_interval(info['duration'], frame_interval)
+
+    ingest = demux_video(video_path, interval_seconds=frame_interval, include_video=not adaptive, info=info)
+
+    if ingest is not None:
+        frames, audio = ingest['frames'], ingest['audio']
+    else:
+        # Sem ffmpeg disponível: volta para OpenCV (frames) e MoviePy (áudio em WAV)
+        frames = None if adaptive else extract_frames(video_path, interval_seconds=frame_interval)
+        audio = extract_audio(video_path)
+
+    state['info'] = info
+    state['frames'] = frames
+    state['audio'] = audio
+
+    if config['fingerprint_index']:
+        state['fingerprint'] = compute_fingerprint(frames, audio, frame_interval)
+        if state['fingerprint'] is not None:
+            conn = open_index(config['fingerprint_index'])
+            state['reused'] = find_match(conn, state['fingerprint'])
+            conn.close()
+
+        if state['reused'] is not None:
+            _, original, score = state['reused']
+            fingerprint.console.print(f"  [green]♻️ Já analisado como {original} "
+                                      f"(similaridade {score:.0%}) — reaproveitando o resultado[/green]")
+
+
+def ocr_stage(state: dict):
+    """Etapa 2: OCR nos frames extraídos (ou amostragem adaptativa)."""
+    _check_cancelled(state)
+    if state['reused'] is not None:
+        state['frames'] = None
+        return
+
+    config = state['config']
+    budget = state['budget']
+
+    if config['adaptive']:
+        state['ocr_entries'] = extract_text_adaptive(
+            state['video_path'], engine=config['ocr_engine'], with_engines=True,
+            prefilter=config['prefilter'], cancel=state['cancel']
+        )
+        _check_cancelled(state)
+        return
+
+    frames = state['frames'] or []
+    if budget is not None:
+        frames = subsample(frames, budget.plan_ocr_frames(len(frames)))
+
+    ocr_start = time.monotonic()
+    state['ocr_entries'] = extract_text_from_frames(
+        frames, workers=config['ocr_workers'], engine=config['ocr_engine'], with_engines=True,
+        prefilter=config['prefilter'], cancel=state['cancel']
+    )
+    _check_cancelled(state)
+    if budget is not None:
+        budget.record_ocr(len(frames), time.monotonic() - ocr_start)
+
+    # Libera memória dos frames
+    state['frames'] = None
+
+
+def _release_audio(state: dict):
+    """Apaga o WAV temporário (se houver) e libera o áudio do estado."""
+    if isinstance(state['audio'], str):
+        cleanup_audio(state['audio'])
+    state['audio'] = None
+
+
+def _plan_whisper(state: dict) -> tuple:
+    """
+    Escolhe o modelo Whisper do vídeo conforme o orçamento.
+
+    Returns:
+        Tupla (modelo ou None para pular a transcrição, segundos de áudio)
+    """
+    audio = state['audio']
+    budget = state['budget']
+    model_name = state['config']['whisper_model']
+
+    audio_seconds = 0
+    if isinstance(audio, str):
+        audio_seconds = (state['info'] or {}).get('duration', 0)
+    elif audio is not None:
+        audio_seconds = len(audio) / AUDIO_SAMPLE_RATE
+
+    if budget is not None and audio is not None:
+        model_name = budget.plan_whisper(audio_seconds, model_name)
+    return model_name, audio_seconds
+
+
+def transcription_stage(state: dict):
+    """Etapa 3: transcreve o áudio (ou pula, se o orçamento não permitir)."""
+    _check_cancelled(state)
+    if state['reused'] is not None:
+        _release_audio(state)
+        return
+
+    budget = state['budget']
+    audio = state['audio']
+    model_name, audio_seconds = _plan_whisper(state)
+
+    if model_name is None:
+        audio_transcriber.console.print("  [yellow]⏭️ Transcrição pulada (sem tempo no orçamento)[/yellow]")
+        state['transcription'] = EMPTY_TRANSCRIPTION
+    else:
+        whisper_start = time.monotonic()
+        state['transcription'] = transcribe_audio(audio, model_name, cancel=state['cancel'])
+        _check_cancelled(state)
+        if budget is not None and audio is not None:
+            budget.record_whisper(model_name, audio_seconds, time.monotonic() - whisper_start)
+
+    _release_audio(state)
+
+
+def batch_transcription_stage(states: list):
+    """
+    Etapa 3 em lote: transcreve o áudio de vários vídeos juntos.
+
+    Os vídeos são agrupados pelo modelo escolhido (o orçamento pode trocar o
+    modelo de cada um) e cada grupo vai em um transcribe_batch. O tempo do
+    lote é dividido entre os vídeos pela duração do áudio: cada orçamento
+    fica parado durante o lote e é cobrado só da sua parte.
+    """
+    paused = [state['budget'] for state in states
+              if state['budget'] is not None and state['budget'].paused_at is None]
+    for budget in paused:
+        budget.pause()
+
+    groups = {}
+    for state in states:
+        if state['reused'] is not None:
+            continue
+
+        model_name, audio_seconds = _plan_whisper(state)
+        if model_name is None:
+            audio_transcriber.console.print("  [yellow]⏭️ Transcrição pulada (sem tempo no orçamento)[/yellow]")
+            state['transcription'] = EMPTY_TRANSCRIPTION
+        else:
+            groups.setdefault(model_name, []).append((state, audio_seconds))
+
+    for model_name, members in groups.items():
+        whisper_start = time.monotonic()
+        transcriptions = transcribe_batch([state['audio'] for state, _ in members], model_name)
+        elapsed = time.monotonic() - whisper_start
+
+        total_seconds = sum(seconds for _, seconds in members)
+        for (state, seconds), transcription in zip(members, transcriptions):
+            state['transcription'] = transcription
+            if state['budget'] is not None and total_seconds:
+                share = elapsed * seconds / total_seconds
+                state['budget'].charge(share)
+                state['budget'].record_whisper(model_name, seconds, share)
+
+    for state in states:
+        _release_audio(state)
+    for budget in paused:
+        budget.resume()
+
+
+def analysis_stage(state: dict) -> dict:
+    """
+    Etapa 4: analisa o contexto e monta o resultado final do vídeo.
+
+    Returns:
+        Dict com todos os resultados da análise
+    """
+    _check_cancelled(state)
+    if state['reused'] is not None:
+        stored, original, _ = state['reused']
+        return dict(stored, video=os.path.basename(state['video_path']), reused_from=original)
+
+    ocr_entries = state['ocr_entries']
+    transcription_result = state['transcription']
+    budget = state['budget']
+
+    ocr_texts = [text for text, _ in ocr_entries]
+    analysis = analyze_content(ocr_texts, transcription_result)
+
+    result = {
+        'video': os.path.basename(state['video_path']),
+        'ocr_text': texts_to_string(ocr_texts),
+        'ocr_texts': [{'text': text, 'engine': engine} for text, engine in ocr_entries],
+        'ocr_engines': dict(Counter(engine for _, engine in ocr_entries)),
+        'transcription': transcription_result.get('text', ''),
+        'language': transcription_result.get('language', 'unknown'),
+        'hashtags': analysis['hashtags'],
+        'description': analysis['description'],
+        'keywords': analysis['keywords'],
+        'categories': analysis['categories'],
+    }
+
+    if budget is not None:
+        result['degradations'] = budget.applied
+        result['elapsed'] = round(budget.elapsed(), 2)
+
+    # Resultado degradado pelo prazo não deve ser reaproveitado por análises completas
+    if state['fingerprint'] is not None and not (budget is not None and budget.applied):
+        conn = open_index(state['config']['fingerprint_index'])
+        add_fingerprint(conn, result['video'], state['fingerprint'], result,
+                        (state['info'] or {}).get('duration', 0.0))
+        conn.close()
+
+    return result
+
+
+def stage_labels(config: dict) -> list:
+    """Descrição de cada etapa (para mostrar o progresso)."""
+    return [
+        "Extraindo frames e áudio...",
+        "Amostragem adaptativa + OCR..." if config['adaptive'] else "Detectando texto (OCR)...",
+        "Transcrevendo áudio...",
+        "Gerando hashtags e descrição...",
+    ]
+
+
+def analyze_video(video_path: str, config: dict = None, on_stage=None, info: dict = None) -> dict:
+    """
+    Analisa um vídeo completo: extrai texto, transcreve áudio, gera hashtags.
+
+    Args:
+        video_path: Caminho completo do vídeo
+        config: Opções da análise (veja DEFAULT_CONFIG)
+        on_stage: Função chamada como on_stage(número, descrição) antes de cada etapa
+        info: Metadados do vídeo, se já lidos (probe_video)
+
+    Returns:
+        Dict com todos os resultados da análise
+    """
+    state = start_video(video_path, config, info)
+    labels = stage_labels(state['config'])
+    stages = (ingest_stage, ocr_stage, transcription_stage)
+
+    for i, stage in enumerate(stages):
+        if on_stage is not None:
+            on_stage(i + 1, labels[i])
+        stage(state)
+
+    if on_stage is not None:
+        on_stage(4, labels[3])
+    return analysis_stage(state)
+
+
+def analyze_batch(video_paths: list, config: dict = None, on_stage=None, infos: dict = None) -> list:
+    """
+    Analisa vários vídeos curtos transcrevendo os áudios em um único lote.
+
+    Ingestão e OCR rodam vídeo a vídeo; depois todos os áudios passam juntos
+    pelo Whisper (batch_transcription_stage) e cada vídeo é analisado. Com
+    --deadline, o orçamento de cada vídeo só corre durante as etapas dele
+    (mais a sua parte do lote do Whisper), não enquanto os outros são
+    processados.
+
+    Args:
+        video_paths: Caminhos dos vídeos
+        config: Opções da análise (veja DEFAULT_CONFIG)
+        on_stage: Função chamada como on_stage(caminho, número, descrição)
+                  antes de cada etapa; na etapa 3, que é do lote todo, o
+                  caminho é None
+        infos: Metadados já lidos, por caminho ({caminho: probe_video})
+
+    Returns:
+        Resultados na ordem dos vídeos; vídeos que falharam viram
+        {'video', 'error'}
+    """
+    states = []
+    failures = {}
+    infos = infos or {}
+
+    for video_path in video_paths:
+        state = start_video(video_path, config, infos.get(video_path))
+        labels = stage_labels(state['config'])
+        try:
+            for i, stage in enumerate((ingest_stage, ocr_stage)):
+                if on_stage is not None:
+                    on_stage(video_path, i + 1, labels[i])
+                stage(state)
+        except Exception as e:
+            failures[video_path] = str(e)
+            _release_audio(state)
+            continue
+        if state['budget'] is not None:
+            state['budget'].pause()
+        states.append(state)
+
+    if on_stage is not None:
+        on_stage(None, 3, f"Transcrevendo {len(states)} áudio(s) em lote...")
+    batch_transcription_stage(states)
+
+    results = {}
+    for state in states:
+        video_path = state['video_path']
+        if on_stage is not None:
+            on_stage(video_path, 4, stage_labels(state['config'])[3])
+        if state['budget'] is not None:
+            state['budget'].resume()
+        try:
+            results[video_path] = analysis_stage(state)
+        except Exception as e:
+            failures[video_path] = str(e)
+
+    return [
+        results[path] if path in results else {'video': os.path.basename(path), 'error': failures[path]}
+        for path in video_paths
+    ]
@@ -53,58 +53,74 @@ def generate_reports(results: list, output_dir: str) -> dict:
 def _generate_txt_report(results: list, filepath: str):
     """Gera relatório legível em TXT."""
     with open(filepath, 'w', encoding='utf-8') as f:
-        f.write("=" * 70 + "\n")
-        f.write("   🎬 TikTok Video Analyzer — Relatório de Análise\n")
-        f.write(f"   📅 Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-        f.write(f"   📹 Total de vídeos analisados: {len(results)}\n")
-        f.write("=" * 70 + "\n\n")
+        _write_txt_header(f, len(results))
         
         for i, result in enumerate(results, 1):
-            f.write(f"{'─' * 70}\n")
-            f.write(f"  📹 VÍDEO {i}: {result['video']}\n")
-            f.write(f"{'─' * 70}\n\n")
-            
-            # Texto OCR
-            ocr_text = result.get('ocr_text', '')
-            if ocr_text:
-                f.write(f"  🔤 TEXTO DETECTADO (OCR):\n")
-                f.write(f"     {ocr_text[:500]}\n\n")
-            else:
-                f.write(f"  🔤 TEXTO DETECTADO (OCR): Nenhum texto encontrado\n\n")
-            
-            # Transcrição
-            transcription = result.get('transcription', '')
-            if transcription:
-                f.write(f"  🎤 TRANSCRIÇÃO DO ÁUDIO:\n")
-                f.write(f"     {transcription[:500]}\n\n")
-            else:
-                f.write(f"  🎤 TRANSCRIÇÃO DO ÁUDIO: Nenhuma fala detectada\n\n")
-            
-            # Categorias
-            categories = result.get('categories', [])
-            if categories:
-                cats_str = ", ".join([f"{cat} ({score}pts)" for cat, score in categories[:3]])
-                f.write(f"  📂 CATEGORIAS: {cats_str}\n\n")
-            
-            # Palavras-chave
-            keywords = result.get('keywords', [])
-            if keywords:
-                kw_str = ", ".join([kw for kw, score in keywords[:8]])
-                f.write(f"  🔑 PALAVRAS-CHAVE: {kw_str}\n\n")
-            
-            # Hashtags
-            hashtags = result.get('hashtags', [])
-            f.write(f"  🏷️ HASHTAGS:\n")
-            f.write(f"     {' '.join(hashtags)}\n\n")
-            
-            # Descrição
-            description = result.get('description', '')
-            f.write(f"  📝 DESCRIÇÃO SUGERIDA:\n")
-            f.write(f"     {description}\n\n")
+            _write_txt_video(f, i, result)
         
-        f.write("=" * 70 + "\n")
-        f.write("   Gerado por TikTok Video Analyzer 🚀\n")
-        f.write("=" * 70 + "\n")
+        _write_txt_footer(f)
+
+
+def _write_txt_header(f, total_videos):
+    """Escreve o cabeçalho do relatório TXT."""
+    f.write("=" * 70 + "\n")
+    f.write("   🎬 TikTok Video Analyzer — Relatório de Análise\n")
+    f.write(f"   📅 Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+    if total_videos is not None:
+        f.write(f"   📹 Total de vídeos analisados: {total_videos}\n")
+    f.write("=" * 70 + "\n\n")
+
+
+def _write_txt_video(f, i: int, result: dict):
+    """Escreve o bloco de um vídeo no relatório TXT."""
+    f.write(f"{'─' * 70}\n")
+    f.write(f"  📹 VÍDEO {i}: {result['video']}\n")
+    f.write(f"{'─' * 70}\n\n")
+    
+    # Texto OCR
+    ocr_text = result.get('ocr_text', '')
+    if ocr_text:
+        f.write(f"  🔤 TEXTO DETECTADO (OCR):\n")
+        f.write(f"     {ocr_text[:500]}\n\n")
+    else:
+        f.write(f"  🔤 TEXTO DETECTADO (OCR): Nenhum texto encontrado\n\n")
+    
+    # Transcrição
+    transcription = result.get('transcription', '')
+    if transcription:
+        f.write(f"  🎤 TRANSCRIÇÃO DO ÁUDIO:\n")
+        f.write(f"     {transcription[:500]}\n\n")
+    else:
+        f.write(f"  🎤 TRANSCRIÇÃO DO ÁUDIO: Nenhuma fala detectada\n\n")
+    
+    # Categorias
+    categories = result.get('categories', [])
+    if categories:
+        cats_str = ", ".join([f"{cat} ({score}pts)" for cat, score in categories[:3]])
+        f.write(f"  📂 CATEGORIAS: {cats_str}\n\n")
+    
+    # Palavras-chave
+    keywords = result.get('keywords', [])
+    if keywords:
+        kw_str = ", ".join([kw for kw, score in keywords[:8]])
+        f.write(f"  🔑 PALAVRAS-CHAVE: {kw_str}\n\n")
+    
+    # Hashtags
+    hashtags = result.get('hashtags', [])
+    f.write(f"  🏷️ HASHTAGS:\n")
+    f.write(f"     {' '.join(hashtags)}\n\n")
+    
+    # Descrição
+    description = result.get('description', '')
+    f.write(f"  📝 DESCRIÇÃO SUGERIDA:\n")
+    f.write(f"     {description}\n\n")
+
+
+def _write_txt_footer(f):
+    """Escreve o rodapé do relatório TXT."""
+    f.write("=" * 70 + "\n")
+    f.write("   Gerado por TikTok Video Analyzer 🚀\n")
+    f.write("=" * 70 + "\n")
 
 
 def _generate_json_report(results: list, filepath: str):
@@ -112,44 +128,113 @@ def _generate_json_report(results: list, filepath: str):
     report = {
         'generated_at': datetime.now().isoformat(),
         'total_videos': len(results),
-        'videos': []
+        'videos': [_video_to_json(result) for result in results]
     }
     
-    for result in results:
-        video_data = {
-            'filename': result['video'],
-            'ocr_text': result.get('ocr_text', ''),
-            'transcription': result.get('transcription', ''),
-            'language': result.get('language', 'unknown'),
-            'hashtags': result.get('hashtags', []),
-            'description': result.get('description', ''),
-            'keywords': [{'word': kw, 'score': round(score, 4)} 
-                        for kw, score in result.get('keywords', [])],
-            'categories': [{'name': cat, 'score': score} 
-                          for cat, score in result.get('categories', [])],
-        }
-        report['videos'].append(video_data)
-    
     with open(filepath, 'w', encoding='utf-8') as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
 
 
+def _video_to_json(result: dict) -> dict:
+    """Converte o resultado de um vídeo para o formato do relatório JSON."""
+    video_data = {
+        'filename': result['video'],
+        'ocr_text': result.get('ocr_text', ''),
+        'ocr_texts': result.get('ocr_texts', []),
+        'ocr_engines': result.get('ocr_engines', {}),
+        'transcription': result.get('transcription', ''),
+        'language': result.get('language', 'unknown'),
+        'hashtags': result.get('hashtags', []),
+        'description': result.get('description', ''),
+        'keywords': [{'word': kw, 'score': round(score, 4)} 
+                    for kw, score in result.get('keywords', [])],
+        'categories': [{'name': cat, 'score': score} 
+                      for cat, score in result.get('categories', [])],
+    }
+    if 'degradations' in result:
+        video_data['degradations'] = result['degradations']
+        video_data['elapsed'] = result.get('elapsed')
+    if 'reused_from' in result:
+        video_data['reused_from'] = result['reused_from']
+    return video_data
+
+
 def _generate_ready_to_post(results: list, filepath: str):
     """Gera arquivo com hashtags e descrições prontas para copiar e colar."""
     with open(filepath, 'w', encoding='utf-8') as f:
-        f.write("📋 PRONTO PARA POSTAR NO TIKTOK\n")
-        f.write(f"📅 {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
-        f.write("=" * 50 + "\n\n")
-        f.write("Copie a descrição + hashtags abaixo para cada vídeo:\n\n")
+        _write_ready_header(f)
         
-        for i, result in enumerate(results, 1):
-            f.write(f"{'━' * 50}\n")
-            f.write(f"📹 {result['video']}\n")
-            f.write(f"{'━' * 50}\n\n")
-            
-            description = result.get('description', '')
-            hashtags = result.get('hashtags', [])
-            
-            # Texto pronto para copiar
-            f.write(f"{description}\n\n")
-            f.write(f"{' '.join(hashtags)}\n\n\n")
+        for result in results:
+            _write_ready_video(f, result)
+
+
+def _write_ready_header(f):
+    """Escreve o cabeçalho do arquivo pronto para postar."""
+    f.write("📋 PRONTO PARA POSTAR NO TIKTOK\n")
+    f.write(f"📅 {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+    f.write("=" * 50 + "\n\n")
+    f.write("Copie a descrição + hashtags abaixo para cada vídeo:\n\n")
+
+
+def _write_ready_video(f, result: dict):
+    """Escreve o bloco de um vídeo no arquivo pronto para postar."""
+    f.write(f"{'━' * 50}\n")
+    f.write(f"📹 {result['video']}\n")
+    f.write(f"{'━' * 50}\n\n")
+    
+    description = result.get('description', '')
+    hashtags = result.get('hashtags', [])
+    
+    # Texto pronto para copiar
+    f.write(f"{description}\n\n")
+    f.write(f"{' '.join(hashtags)}\n\n\n")
+
+
+def start_report_session(output_dir: str) -> dict:
+    """
+    Inicia relatórios incrementais (modo observação): cria os arquivos
+    com cabeçalho e depois cada vídeo é acrescentado com append_to_report_session.
+    
+    Args:
+        output_dir: Pasta para salvar os relatórios
+    
+    Returns:
+        Dict da sessão, com os caminhos dos relatórios e os resultados acumulados
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    session = {
+        'txt': os.path.join(output_dir, f"resultados_{timestamp}.txt"),
+        'json': os.path.join(output_dir, f"resultados_{timestamp}.json"),
+        'ready': os.path.join(output_dir, f"pronto_para_postar_{timestamp}.txt"),
+        'results': [],
+    }
+    
+    with open(session['txt'], 'w', encoding='utf-8') as f:
+        _write_txt_header(f, None)
+    with open(session['ready'], 'w', encoding='utf-8') as f:
+        _write_ready_header(f)
+    _generate_json_report([], session['json'])
+    
+    console.print(f"\n[green]📁 Relatórios incrementais em: {output_dir}/[/green]")
+    console.print(f"   📄 {os.path.basename(session['txt'])}")
+    console.print(f"   📊 {os.path.basename(session['json'])}")
+    console.print(f"   📋 {os.path.basename(session['ready'])}")
+    
+    return session
+
+
+def append_to_report_session(session: dict, result: dict):
+    """
+    Acrescenta o resultado de um vídeo aos relatórios da sessão.
+    O TXT e o arquivo pronto para postar crescem por append; o JSON é
+    reescrito com todos os resultados da sessão (continua um JSON válido).
+    """
+    session['results'].append(result)
+    
+    with open(session['txt'], 'a', encoding='utf-8') as f:
+        _write_txt_video(f, len(session['results']), result)
+    with open(session['ready'], 'a', encoding='utf-8') as f:
+        _write_ready_video(f, result)
+    _generate_json_report(session['results'], session['json'])
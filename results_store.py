@@ -0,0 +1,219 @@
+"""
+Histórico de resultados em SQLite.
+Cada vídeo analisado vira uma linha em `videos`, com as hashtags,
+palavras-chave e categorias em tabelas próprias indexadas — assim consultas
+como "quais vídeos receberam #financas" não precisam abrir centenas de JSONs.
+
+Uso:
+    python3 -m tiktok_analyzer.results_store hashtag "#financas"   # vídeos com a hashtag
+    python3 -m tiktok_analyzer.results_store palavras financas     # top palavras-chave da categoria
+    python3 -m tiktok_analyzer.results_store hashtags              # hashtags mais usadas
+    python3 -m tiktok_analyzer.results_store video "meu_video.mp4" # histórico de um vídeo
+    (use --banco caminho.db antes do comando para outro arquivo)
+"""
+
+import os
+import sys
+import sqlite3
+from datetime import datetime
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultados", "resultados.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id            INTEGER PRIMARY KEY,
+    filename      TEXT NOT NULL,
+    analyzed_at   TEXT NOT NULL,
+    language      TEXT,
+    description   TEXT,
+    ocr_text      TEXT,
+    transcription TEXT
+);
+CREATE TABLE IF NOT EXISTS ocr_texts (
+    video_id INTEGER NOT NULL REFERENCES videos(id),
+    position INTEGER NOT NULL,
+    text     TEXT NOT NULL,
+    engine   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS hashtags (
+    video_id INTEGER NOT NULL REFERENCES videos(id),
+    position INTEGER NOT NULL,
+    tag      TEXT NOT NULL COLLATE NOCASE
+);
+CREATE TABLE IF NOT EXISTS keywords (
+    video_id INTEGER NOT NULL REFERENCES videos(id),
+    word     TEXT NOT NULL,
+    score    REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS categories (
+    video_id INTEGER NOT NULL REFERENCES videos(id),
+    rank     INTEGER NOT NULL,
+    name     TEXT NOT NULL,
+    score    REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_filename ON videos(filename);
+CREATE INDEX IF NOT EXISTS idx_ocr_texts_video ON ocr_texts(video_id);
+CREATE INDEX IF NOT EXISTS idx_hashtags_tag ON hashtags(tag, video_id);
+CREATE INDEX IF NOT EXISTS idx_hashtags_video ON hashtags(video_id);
+CREATE INDEX IF NOT EXISTS idx_keywords_word ON keywords(word, video_id);
+CREATE INDEX IF NOT EXISTS idx_keywords_video ON keywords(video_id);
+CREATE INDEX IF NOT EXISTS idx_categories_name ON categories(name, rank, video_id);
+"""
+
+
+def open_store(db_path: str = None) -> sqlite3.Connection:
+    """
+    Abre (ou cria) o banco de resultados.
+
+    Args:
+        db_path: Caminho do arquivo SQLite (padrão: resultados/resultados.db)
+
+    Returns:
+        Conexão SQLite pronta para uso
+    """
+    db_path = db_path or DEFAULT_DB_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def append_results(conn: sqlite3.Connection, results: list):
+    """
+    Acrescenta os resultados de vários vídeos ao banco (uma transação).
+
+    Args:
+        conn: Conexão retornada por open_store
+        results: Lista de dicts com resultados por vídeo
+    """
+    analyzed_at = datetime.now().isoformat()
+
+    with conn:
+        for result in results:
+            cursor = conn.execute(
+                "INSERT INTO videos (filename, analyzed_at, language, description, ocr_text, transcription)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (result['video'], analyzed_at, result.get('language', 'unknown'),
+                 result.get('description', ''), result.get('ocr_text', ''),
+                 result.get('transcription', ''))
+            )
+            video_id = cursor.lastrowid
+
+            conn.executemany(
+                "INSERT INTO ocr_texts (video_id, position, text, engine) VALUES (?, ?, ?, ?)",
+                [(video_id, i, entry['text'], entry['engine'])
+                 for i, entry in enumerate(result.get('ocr_texts', []))]
+            )
+            conn.executemany(
+                "INSERT INTO hashtags (video_id, position, tag) VALUES (?, ?, ?)",
+                [(video_id, i, tag) for i, tag in enumerate(result.get('hashtags', []))]
+            )
+            conn.executemany(
+                "INSERT INTO keywords (video_id, word, score) VALUES (?, ?, ?)",
+                [(video_id, word, float(score)) for word, score in result.get('keywords', [])]
+            )
+            conn.executemany(
+                "INSERT INTO categories (video_id, rank, name, score) VALUES (?, ?, ?, ?)",
+                [(video_id, i, name, float(score))
+                 for i, (name, score) in enumerate(result.get('categories', []))]
+            )
+
+
+def videos_with_hashtag(conn: sqlite3.Connection, tag: str, limit: int = 100) -> list:
+    """Vídeos que receberam a hashtag (mais recentes primeiro): (arquivo, data)."""
+    if not tag.startswith('#'):
+        tag = f"#{tag}"
+    return conn.execute(
+        "SELECT v.filename, v.analyzed_at FROM hashtags h JOIN videos v ON v.id = h.video_id"
+        " WHERE h.tag = ? ORDER BY v.id DESC LIMIT ?",
+        (tag, limit)
+    ).fetchall()
+
+
+def top_keywords(conn: sqlite3.Connection, category: str, limit: int = 20) -> list:
+    """Palavras-chave mais frequentes nos vídeos cuja categoria principal é `category`: (palavra, vídeos, score médio)."""
+    return conn.execute(
+        "SELECT k.word, COUNT(*) AS n, AVG(k.score) FROM categories c"
+        " JOIN keywords k ON k.video_id = c.video_id"
+        " WHERE c.name = ? AND c.rank = 0"
+        " GROUP BY k.word ORDER BY n DESC, AVG(k.score) DESC LIMIT ?",
+        (category, limit)
+    ).fetchall()
+
+
+def top_hashtags(conn: sqlite3.Connection, limit: int = 20) -> list:
+    """Hashtags mais usadas em todo o histórico: (hashtag, vídeos)."""
+    return conn.execute(
+        "SELECT tag, COUNT(*) AS n FROM hashtags GROUP BY tag ORDER BY n DESC LIMIT ?",
+        (limit,)
+    ).fetchall()
+
+
+def video_history(conn: sqlite3.Connection, filename: str) -> list:
+    """Todas as análises de um vídeo: (data, idioma, hashtags, descrição)."""
+    return conn.execute(
+        "SELECT v.analyzed_at, v.language,"
+        " (SELECT GROUP_CONCAT(tag, ' ') FROM (SELECT tag FROM hashtags WHERE video_id = v.id ORDER BY position)),"
+        " v.description"
+        " FROM videos v WHERE v.filename = ? ORDER BY v.id DESC",
+        (filename,)
+    ).fetchall()
+
+
+def _print_rows(title: str, columns: list, rows: list):
+    """Mostra o resultado de uma consulta como tabela."""
+    table = Table(title=title, box=box.ROUNDED, border_style="cyan", title_style="bold white")
+    for column in columns:
+        table.add_column(column)
+    for row in rows:
+        table.add_row(*[f"{value:.4f}" if isinstance(value, float) else str(value) for value in row])
+    console.print(table)
+
+
+def main():
+    """CLI de consulta ao histórico."""
+    args = sys.argv[1:]
+    db_path = None
+    if len(args) >= 2 and args[0] == '--banco':
+        db_path = args[1]
+        args = args[2:]
+
+    if not args:
+        console.print(__doc__)
+        sys.exit(1)
+
+    if not os.path.exists(db_path or DEFAULT_DB_PATH):
+        console.print(f"[red]❌ Banco não encontrado: {db_path or DEFAULT_DB_PATH}[/red]")
+        sys.exit(1)
+
+    conn = open_store(db_path)
+    command, params = args[0], args[1:]
+
+    if command == 'hashtag' and params:
+        _print_rows(f"Vídeos com {params[0]}", ["Vídeo", "Analisado em"],
+                    videos_with_hashtag(conn, params[0]))
+    elif command == 'palavras' and params:
+        _print_rows(f"Top palavras-chave — {params[0]}", ["Palavra", "Vídeos", "Score médio"],
+                    top_keywords(conn, params[0]))
+    elif command == 'hashtags':
+        _print_rows("Hashtags mais usadas", ["Hashtag", "Vídeos"], top_hashtags(conn))
+    elif command == 'video' and params:
+        _print_rows(f"Histórico — {params[0]}", ["Analisado em", "Idioma", "Hashtags", "Descrição"],
+                    video_history(conn, params[0]))
+    else:
+        console.print(__doc__)
+        sys.exit(1)
+
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Agendamento dos vídeos entre os workers.
+Lê os metadados do contêiner de cada vídeo (duração, resolução, áudio) sem
+decodificar nada e decide a ordem de processamento:
+
+    - 'longa': mais longos primeiro (minimiza o tempo total do lote
+      quando há vários workers — heurística LPT)
+    - 'curta': mais curtos primeiro (minimiza a latência média por vídeo)
+    - 'nome':  ordem alfabética (comportamento antigo)
+
+Prioridades maiores sempre vão na frente, independente da estratégia.
+"""
+
+import os
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from tiktok_analyzer.video_processor import probe_video
+
+STRATEGIES = ('longa', 'curta', 'nome')
+
+# Resolução de referência para o peso de decodificação (1080p vertical)
+_REFERENCE_PIXELS = 1080 * 1920
+
+# Custo relativo da transcrição em relação ao OCR, por segundo de vídeo
+_AUDIO_WEIGHT = 0.5
+
+
+def estimate_cost(info: dict) -> float:
+    """
+    Estima o custo relativo de processar um vídeo a partir dos metadados.
+
+    O OCR cresce com a duração (frames amostrados) e um pouco com a
+    resolução (decodificação); a transcrição só existe se houver áudio.
+    """
+    duration = info['duration']
+    pixels = info['width'] * info['height']
+    cost = duration * (1.0 + 0.25 * pixels / _REFERENCE_PIXELS)
+    if info['has_audio']:
+        cost += duration * _AUDIO_WEIGHT
+    return cost
+
+
+def _probe_job(path: str) -> dict:
+    """Monta o job de um vídeo (usa o tamanho do arquivo se o ffprobe falhar)."""
+    info = probe_video(path)
+    job = {'path': path, 'info': info, 'priority': 0}
+
+    if info is not None:
+        job['cost'] = estimate_cost(info)
+    else:
+        # Sem metadados: o tamanho do arquivo é um substituto razoável da duração
+        job['cost'] = os.path.getsize(path) / 1e6
+
+    return job
+
+
+def probe_videos(paths: list, max_workers: int = 8) -> list:
+    """
+    Lê os metadados de vários vídeos em paralelo (ffprobe é I/O-bound).
+
+    Returns:
+        Lista de jobs: dicts com 'path', 'info' (de probe_video ou None),
+        'cost' (custo relativo estimado) e 'priority'
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_probe_job, paths))
+
+
+def order_jobs(jobs: list, strategy: str = 'longa', priorities: dict = None) -> list:
+    """
+    Ordena os jobs para execução.
+
+    Args:
+        jobs: Jobs retornados por probe_videos
+        strategy: 'longa', 'curta' ou 'nome'
+        priorities: Dict {nome do arquivo: prioridade} (maior vai antes)
+
+    Returns:
+        Nova lista de jobs na ordem de execução
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Estratégia desconhecida: {strategy} (use {', '.join(STRATEGIES)})")
+
+    priorities = priorities or {}
+    for job in jobs:
+        job['priority'] = priorities.get(os.path.basename(job['path']), 0)
+
+    if strategy == 'longa':
+        key = lambda job: (-job['priority'], -job['cost'])
+    elif strategy == 'curta':
+        key = lambda job: (-job['priority'], job['cost'])
+    else:
+        key = lambda job: (-job['priority'], os.path.basename(job['path']).lower())
+
+    return sorted(jobs, key=key)
+
+
+def assign_jobs(jobs: list, n_workers: int) -> list:
+    """
+    Distribui os jobs (já ordenados) entre os workers: cada job vai para o
+    worker com menor carga acumulada, como faz um pool com fila única.
+
+    Returns:
+        Lista com a lista de jobs de cada worker
+    """
+    loads = [(0.0, i) for i in range(n_workers)]
+    heapq.heapify(loads)
+    assignment = [[] for _ in range(n_workers)]
+
+    for job in jobs:
+        load, worker = heapq.heappop(loads)
+        assignment[worker].append(job)
+        heapq.heappush(loads, (load + job['cost'], worker))
+
+    return assignment
+
+
+def estimated_makespan(jobs: list, n_workers: int) -> float:
+    """Custo do worker mais carregado para a ordem dada (em unidades de custo)."""
+    return max((sum(job['cost'] for job in worker_jobs)
+                for worker_jobs in assign_jobs(jobs, n_workers)), default=0.0)
@@ -0,0 +1,193 @@
+"""
+Pré-filtro barato de presença de texto.
+Dá uma nota de "parece ter texto" para cada frame, a partir de uma versão
+reduzida em tons de cinza: bordas finas (gradiente morfológico) agrupadas
+na horizontal formam blocos largos, baixos e densos quando há letras, e
+manchas irregulares em rostos/paisagens. Frames abaixo do limiar pulam o OCR.
+
+Avaliação (pular frames x textos perdidos, em relação ao OCR de todos os frames):
+    python3 -m tiktok_analyzer.text_prefilter video1.mp4 video2.mp4 [--intervalo 2]
+"""
+
+import sys
+import time
+import cv2
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+from rich import box
+
+console = Console()
+
+# Largura usada na análise (os frames são reduzidos antes)
+ANALYSIS_WIDTH = 320
+
+# Limiar padrão: fração da imagem coberta por blocos com forma de texto
+DEFAULT_THRESHOLD = 0.002
+
+# Limiares comparados na avaliação
+EVALUATION_THRESHOLDS = (0.001, 0.002, 0.003, 0.005, 0.01, 0.02)
+
+_GRADIENT_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+_LINE_KERNEL = cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1))
+
+
+def text_likelihood(frame) -> float:
+    """
+    Calcula a nota de presença de texto de um frame.
+
+    Args:
+        frame: Frame BGR (numpy array)
+
+    Returns:
+        Fração da imagem (0-1) coberta por blocos com forma de linha de texto
+    """
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+    height, width = gray.shape
+    if width > ANALYSIS_WIDTH:
+        height = max(int(height * ANALYSIS_WIDTH / width), 1)
+        width = ANALYSIS_WIDTH
+        gray = cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+    # Bordas finas e de alto contraste (traços de letras)
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, _GRADIENT_KERNEL)
+    if gradient.max() < 40:
+        # Frame praticamente liso
+        return 0.0
+    _, edges = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+
+    # Junta letras vizinhas em blocos de linha
+    lines = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, _LINE_KERNEL)
+    n, _, stats, _ = cv2.connectedComponentsWithStats(lines, connectivity=8)
+    if n <= 1:
+        return 0.0
+
+    stats = stats[1:]
+    w = stats[:, cv2.CC_STAT_WIDTH].astype(np.float32)
+    h = stats[:, cv2.CC_STAT_HEIGHT].astype(np.float32)
+    area = stats[:, cv2.CC_STAT_AREA].astype(np.float32)
+    box_area = w * h
+
+    # Linhas de texto: mais largas que altas, altura de letra, bloco denso
+    text_like = (
+        (w >= 2 * h)
+        & (h >= 4)
+        & (h <= 0.25 * height)
+        & (area >= 0.45 * box_area)
+    )
+
+    return float(box_area[text_like].sum() / (height * width))
+
+
+def filter_frames(frames: list, threshold: float = DEFAULT_THRESHOLD) -> tuple:
+    """
+    Separa os frames que devem passar pelo OCR.
+
+    Returns:
+        Tupla (frames mantidos, número de frames pulados)
+    """
+    kept = [frame for frame in frames if text_likelihood(frame) >= threshold]
+    return kept, len(frames) - len(kept)
+
+
+def evaluate(frame_sets: list, engine: str = 'easyocr', thresholds: tuple = EVALUATION_THRESHOLDS) -> list:
+    """
+    Compara o pré-filtro com o OCR em todos os frames (referência).
+
+    O OCR roda uma vez em cada frame; para cada limiar, calcula quantos
+    frames seriam pulados e quantos textos únicos da referência se perderiam.
+
+    Args:
+        frame_sets: Lista com a lista de frames de cada vídeo
+        engine: Motor de OCR usado na referência
+        thresholds: Limiares a comparar
+
+    Returns:
+        Lista de dicts com 'threshold', 'skip_rate', 'recall_loss' e 'ocr_time'
+    """
+    from tiktok_analyzer.ocr_engines import get_engine
+    from tiktok_analyzer.ocr_extractor import _read_frame, _normalize
+
+    ocr_engine = get_engine(engine)
+    videos = []
+
+    for frames in frame_sets:
+        scored = []
+        for frame in frames:
+            score = text_likelihood(frame)
+            start = time.monotonic()
+            texts = {_normalize(text) for text, _ in _read_frame(ocr_engine, frame, 0.3)}
+            scored.append((score, texts, time.monotonic() - start))
+        videos.append(scored)
+
+    total_frames = sum(len(scored) for scored in videos)
+    total_time = sum(t for scored in videos for _, _, t in scored)
+    reference = sum(len(set().union(*(texts for _, texts, _ in scored))) for scored in videos if scored)
+
+    report = []
+    for threshold in thresholds:
+        skipped = 0
+        kept_texts = 0
+        ocr_time = 0.0
+
+        for scored in videos:
+            texts = set()
+            for score, frame_texts, t in scored:
+                if score >= threshold:
+                    texts |= frame_texts
+                    ocr_time += t
+                else:
+                    skipped += 1
+            kept_texts += len(texts)
+
+        report.append({
+            'threshold': threshold,
+            'skip_rate': skipped / total_frames if total_frames else 0.0,
+            'recall_loss': 1 - kept_texts / reference if reference else 0.0,
+            'ocr_time': ocr_time,
+        })
+
+    report.insert(0, {'threshold': None, 'skip_rate': 0.0, 'recall_loss': 0.0, 'ocr_time': total_time})
+    return report
+
+
+def main():
+    """Avalia o pré-filtro nos vídeos passados na linha de comando."""
+    from tiktok_analyzer.video_processor import demux_video, extract_frames
+
+    args = sys.argv[1:]
+    interval = 2.0
+    paths = []
+    i = 0
+    while i < len(args):
+        if args[i] == '--intervalo' and i + 1 < len(args):
+            interval = float(args[i + 1])
+            i += 2
+        else:
+            paths.append(args[i])
+            i += 1
+
+    if not paths:
+        console.print(__doc__)
+        sys.exit(1)
+
+    frame_sets = []
+    for path in paths:
+        ingest = demux_video(path, interval_seconds=interval)
+        frame_sets.append(ingest['frames'] if ingest is not None else extract_frames(path, interval))
+
+    table = Table(title="📊 Pré-filtro de texto", box=box.ROUNDED, border_style="cyan", title_style="bold white")
+    table.add_column("Limiar")
+    table.add_column("Frames pulados", style="green")
+    table.add_column("Textos perdidos", style="red")
+    table.add_column("Tempo de OCR", style="blue")
+
+    for row in evaluate(frame_sets):
+        threshold = "sem filtro" if row['threshold'] is None else f"{row['threshold']:g}"
+        table.add_row(threshold, f"{row['skip_rate']:.1%}", f"{row['recall_loss']:.1%}", f"{row['ocr_time']:.1f}s")
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
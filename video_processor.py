@@ -4,13 +4,21 @@ Extrai frames (para OCR) e áudio (para transcrição) dos vídeos.
 """
 
 import os
+import json
+import shutil
+import subprocess
 import tempfile
+import threading
 import cv2
+import numpy as np
 from moviepy import VideoFileClip
 from rich.console import Console
 
 console = Console()
 
+# Taxa de amostragem esperada pelo Whisper
+AUDIO_SAMPLE_RATE = 16000
+
 
 def extract_frames(video_path: str, interval_seconds: float = 2.0) -> list:
     """
@@ -25,15 +33,10 @@ def extract_frames(video_path: str, interval_seconds: float = 2.0) -> list:
     """
     frames = []
     
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        console.print(f"[red]❌ Não foi possível abrir o vídeo: {video_path}[/red]")
+    cap, fps, duration = open_video(video_path)
+    if cap is None:
         return frames
     
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-    duration = total_frames / fps if fps > 0 else 0
-    
     frame_interval = int(fps * interval_seconds)
     if frame_interval < 1:
         frame_interval = 1
@@ -58,6 +61,49 @@ def extract_frames(video_path: str, interval_seconds: float = 2.0) -> list:
     return frames
 
 
+def open_video(video_path: str):
+    """
+    Abre o vídeo com OpenCV para leitura com saltos (seek).
+    
+    Args:
+        video_path: Caminho do arquivo de vídeo
+    
+    Returns:
+        Tupla (captura, fps, duração em segundos), ou (None, 0, 0) se falhar
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        console.print(f"[red]❌ Não foi possível abrir o vídeo: {video_path}[/red]")
+        return None, 0, 0
+    
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    duration = total_frames / fps if fps > 0 else 0
+    
+    return cap, fps, duration
+
+
+def read_frame_at(cap, timestamp: float, fps: float):
+    """
+    Lê o frame mais próximo de um instante do vídeo.
+    
+    Args:
+        cap: Captura aberta com open_video()
+        timestamp: Instante desejado (segundos)
+        fps: FPS do vídeo
+    
+    Returns:
+        Frame (numpy array) ou None se a leitura falhar
+    """
+    if fps > 0:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(round(timestamp * fps)))
+    else:
+        cap.set(cv2.CAP_PROP_POS_MSEC, timestamp * 1000.0)
+    
+    ret, frame = cap.read()
+    return frame if ret else None
+
+
 def extract_audio(video_path: str, output_dir: str = None) -> str:
     """
     Extrai o áudio do vídeo como arquivo WAV.
@@ -98,3 +144,240 @@ def extract_audio(video_path: str, output_dir: str = None) -> str:
     except Exception as e:
         console.print(f"  [yellow]⚠️ Erro ao extrair áudio: {e}[/yellow]")
         return None
+
+
+def _parse_rate(rate: str) -> float:
+    """Converte uma taxa do ffprobe ('30000/1001') em float."""
+    try:
+        num, _, den = rate.partition('/')
+        return float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return 0.0
+
+
+def probe_video(video_path: str) -> dict:
+    """
+    Lê os metadados do contêiner com ffprobe, sem decodificar o vídeo.
+    
+    Args:
+        video_path: Caminho do arquivo de vídeo
+    
+    Returns:
+        Dict com 'duration', 'width', 'height', 'fps' e 'has_audio',
+        ou None se o ffprobe não estiver disponível ou falhar
+    """
+    if shutil.which('ffprobe') is None:
+        return None
+    
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-print_format', 'json',
+        '-show_format', '-show_streams',
+        video_path,
+    ]
+    
+    try:
+        output = subprocess.run(cmd, capture_output=True, check=True).stdout
+        info = json.loads(output)
+    except (subprocess.CalledProcessError, ValueError):
+        return None
+    
+    streams = info.get('streams', [])
+    video_stream = next((st for st in streams if st.get('codec_type') == 'video'), None)
+    has_audio = any(st.get('codec_type') == 'audio' for st in streams)
+    
+    if video_stream is None:
+        return None
+    
+    width = int(video_stream.get('width', 0))
+    height = int(video_stream.get('height', 0))
+    
+    # Vídeos de celular costumam vir rotacionados via metadado;
+    # o ffmpeg aplica a rotação ao decodificar, então trocamos as dimensões
+    rotation = video_stream.get('tags', {}).get('rotate', 0)
+    for side_data in video_stream.get('side_data_list', []):
+        rotation = side_data.get('rotation', rotation)
+    if abs(int(float(rotation))) % 180 == 90:
+        width, height = height, width
+    
+    duration = info.get('format', {}).get('duration') or video_stream.get('duration') or 0
+    
+    return {
+        'duration': float(duration),
+        'width': width,
+        'height': height,
+        'fps': _parse_rate(video_stream.get('avg_frame_rate', '0/1')),
+        'has_audio': has_audio,
+    }
+
+
+def _scaled_size(width: int, height: int, max_width: int = None) -> tuple:
+    """Calcula o tamanho de saída dos frames (dimensões pares para o ffmpeg)."""
+    if max_width and width > max_width:
+        height = int(round(height * max_width / width))
+        width = max_width
+    return width - width % 2, height - height % 2
+
+
+def _read_growing(stream, buffer: np.ndarray) -> tuple:
+    """
+    Lê do pipe direto para o buffer (bytes) até o pipe fechar.
+    Se o buffer encher (duração do cabeçalho menor que a real, comum em
+    vídeos VFR ou com cabeçalho quebrado), ele dobra de tamanho em vez de
+    descartar o resto.
+    
+    Returns:
+        Tupla (buffer, possivelmente realocado, número de bytes lidos)
+    """
+    total = 0
+    while True:
+        if total == len(buffer):
+            grown = np.empty(max(2 * len(buffer), 1 << 16), dtype=np.uint8)
+            grown[:total] = buffer
+            buffer = grown
+        n = stream.readinto(memoryview(buffer)[total:])
+        if not n:
+            return buffer, total
+        total += n
+
+
+def demux_video(video_path: str, interval_seconds: float = 2.0,
+                max_width: int = None, include_video: bool = True, info: dict = None) -> dict:
+    """
+    Extrai frames e áudio do vídeo em uma única passada do ffmpeg.
+    
+    Um só processo ffmpeg decodifica o contêiner e escreve, ao mesmo tempo,
+    os frames amostrados (BGR, como o OpenCV) no stdout e o áudio PCM
+    16kHz mono em um segundo pipe. Os dois são lidos direto para buffers
+    NumPy pré-alocados com o tamanho estimado pelo ffprobe, que crescem se
+    o vídeo for mais longo que o cabeçalho diz.
+    
+    Args:
+        video_path: Caminho do arquivo de vídeo
+        interval_seconds: Intervalo entre frames extraídos (padrão: 2s)
+        max_width: Largura máxima dos frames (redimensiona mantendo proporção)
+        include_video: Se False, extrai só o áudio
+        info: Metadados já lidos com probe_video (evita rodar o ffprobe de novo)
+    
+    Returns:
+        Dict com 'frames' (lista de numpy arrays), 'audio' (numpy float32
+        16kHz, ou None se não houver áudio) e 'duration', ou None se o
+        ffmpeg não estiver disponível ou falhar
+    """
+    if shutil.which('ffmpeg') is None:
+        return None
+    
+    if info is None:
+        info = probe_video(video_path)
+    if info is None:
+        return None
+    
+    duration = info['duration']
+    has_audio = info['has_audio']
+    width, height = _scaled_size(info['width'], info['height'], max_width)
+    
+    cmd = ['ffmpeg', '-v', 'error', '-nostdin', '-i', video_path]
+    
+    frame_size = height * width * 3
+    frame_buffer = None
+    if include_video:
+        n_frames = int(duration / interval_seconds) + 2
+        frame_buffer = np.empty(n_frames * frame_size, dtype=np.uint8)
+        cmd += [
+            '-map', '0:v:0',
+            '-vf', f'fps=1/{interval_seconds:g},scale={width}:{height}',
+            '-f', 'rawvideo', '-pix_fmt', 'bgr24', 'pipe:1',
+        ]
+    
+    audio_buffer = None
+    read_fd = write_fd = None
+    if has_audio:
+        # 1s de folga para diferenças entre a duração do contêiner e a do áudio
+        audio_buffer = np.empty(int((duration + 1) * AUDIO_SAMPLE_RATE) * 2, dtype=np.uint8)
+        read_fd, write_fd = os.pipe()
+        cmd += [
+            '-map', '0:a:0',
+            '-ac', '1', '-ar', str(AUDIO_SAMPLE_RATE),
+            '-f', 's16le', f'pipe:{write_fd}',
+        ]
+    
+    if not include_video and not has_audio:
+        console.print("  🔇 Vídeo sem áudio")
+        return {'frames': [], 'audio': None, 'duration': duration}
+    
+    # O stderr vai para um arquivo: com o pipe, mensagens demais de um vídeo
+    # danificado encheriam o buffer e travariam o ffmpeg
+    with tempfile.TemporaryFile() as stderr_file:
+        try:
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE if include_video else subprocess.DEVNULL,
+                stderr=stderr_file,
+                pass_fds=(write_fd,) if write_fd is not None else (),
+            )
+        except OSError as e:
+            if read_fd is not None:
+                os.close(read_fd)
+            console.print(f"  [yellow]⚠️ Erro ao iniciar o ffmpeg: {e}[/yellow]")
+            return None
+        finally:
+            if write_fd is not None:
+                os.close(write_fd)
+        
+        audio_read = [audio_buffer, 0]
+        audio_thread = None
+        try:
+            if has_audio:
+                def read_audio():
+                    with os.fdopen(read_fd, 'rb', buffering=0) as audio_pipe:
+                        audio_read[:] = _read_growing(audio_pipe, audio_buffer)
+                
+                # O áudio é lido em paralelo para nenhum dos pipes encher e travar o ffmpeg
+                audio_thread = threading.Thread(target=read_audio, daemon=True)
+                audio_thread.start()
+            
+            video_bytes = 0
+            if include_video:
+                frame_buffer, video_bytes = _read_growing(proc.stdout, frame_buffer)
+            
+            if audio_thread is not None:
+                audio_thread.join()
+            returncode = proc.wait()
+        finally:
+            # Em caso de erro, não deixa o ffmpeg órfão nem a thread presa no pipe
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            if proc.stdout is not None:
+                proc.stdout.close()
+            if has_audio and audio_thread is None:
+                os.close(read_fd)
+        
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='replace').strip()
+            console.print(f"  [yellow]⚠️ Erro no ffmpeg: {stderr[-200:]}[/yellow]")
+            return None
+    
+    frames = []
+    if include_video:
+        extracted = video_bytes // frame_size
+        frames = list(frame_buffer[:extracted * frame_size].reshape(extracted, height, width, 3))
+        duration = max(duration, (extracted - 1) * interval_seconds)
+        console.print(f"  📸 {extracted} frames extraídos ({duration:.1f}s de vídeo)")
+    
+    audio = None
+    audio_buffer, audio_bytes = audio_read
+    if has_audio and audio_bytes > 0:
+        samples = audio_buffer[:audio_bytes - audio_bytes % 2].view('<i2')
+        audio = samples.astype(np.float32) / 32768.0
+        duration = max(duration, len(audio) / AUDIO_SAMPLE_RATE)
+        console.print(f"  🎵 Áudio extraído com sucesso")
+    else:
+        console.print("  🔇 Vídeo sem áudio")
+    
+    return {
+        'frames': frames,
+        'audio': audio,
+        'duration': duration,
+    }
@@ -0,0 +1,194 @@
+"""
+Modo observação de pasta.
+Detecta vídeos novos assim que terminam de ser gravados e chama o
+processamento para cada um, no mesmo processo (os modelos ficam carregados).
+
+No Linux usa inotify (via ctypes, sem dependências extras); em outros
+sistemas, ou se o inotify falhar, faz polling da pasta. Nos dois casos o
+arquivo só é entregue depois de ficar `debounce` segundos sem mudar de
+tamanho/data, para não pegar uploads pela metade.
+"""
+
+import os
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+from rich.console import Console
+
+console = Console()
+
+VIDEO_EXTENSIONS = ('.mp4',)
+
+# Eventos do inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, len
+
+
+class _InotifySource:
+    """Fonte de eventos via inotify: retorna os nomes de arquivos alterados."""
+
+    def __init__(self, folder: str):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falhou")
+
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), "inotify_add_watch falhou")
+
+        self.folder = folder
+
+    def wait(self, timeout: float) -> set:
+        """
+        Espera eventos por até `timeout` segundos.
+
+        Se a fila do kernel estourou (IN_Q_OVERFLOW), eventos se perderam:
+        devolve todos os vídeos da pasta para serem verificados de novo.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except OSError as e:
+            if e.errno == errno.EAGAIN:
+                return set()
+            raise
+
+        names = set()
+        pos = 0
+        while pos + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, pos)
+            pos += _EVENT_HEADER.size
+            name = data[pos:pos + length].rstrip(b'\0')
+            pos += length
+            if mask & IN_Q_OVERFLOW:
+                names.update(_list_videos(self.folder))
+            elif name:
+                names.add(os.path.join(self.folder, os.fsdecode(name)))
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class _PollingSource:
+    """Fonte de eventos por polling: lista a pasta a cada chamada."""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+
+    def wait(self, timeout: float) -> set:
+        time.sleep(timeout)
+        return set(_list_videos(self.folder))
+
+    def close(self):
+        pass
+
+
+def _is_video(path: str) -> bool:
+    return path.lower().endswith(VIDEO_EXTENSIONS) and not os.path.basename(path).startswith('.')
+
+
+def _list_videos(folder: str) -> list:
+    """Lista os vídeos da pasta."""
+    try:
+        return [os.path.join(folder, name) for name in os.listdir(folder)
+                if _is_video(name)]
+    except FileNotFoundError:
+        return []
+
+
+def _signature(path: str):
+    """(tamanho, mtime) do arquivo, ou None se não existir mais."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def watch_folder(folder: str, on_video, debounce: float = 3.0, poll_interval: float = 1.0,
+                 use_inotify: bool = True):
+    """
+    Observa a pasta e chama on_video(caminho) para cada vídeo novo completo.
+
+    Vídeos que já estavam completos na pasta ao iniciar são ignorados; os
+    que ainda estavam sendo gravados (modificados há menos de `debounce`
+    segundos, ou vazios) entram como pendentes e são entregues quando
+    terminarem. Um vídeo já entregue (ou ignorado) volta a ser entregue se
+    o arquivo mudar depois, como num novo upload com o mesmo nome. Roda até Ctrl+C (KeyboardInterrupt é repassado para quem
+    chamou).
+
+    Args:
+        folder: Pasta a observar
+        on_video: Função chamada com o caminho de cada vídeo pronto
+        debounce: Segundos sem mudanças para considerar o upload concluído
+        poll_interval: Intervalo entre verificações (segundos)
+        use_inotify: Se False, usa sempre polling
+    """
+    source = None
+    if use_inotify:
+        try:
+            source = _InotifySource(folder)
+            console.print(f"  👀 Observando {folder} (inotify)")
+        except (OSError, AttributeError):
+            source = None
+    if source is None:
+        source = _PollingSource(folder)
+        console.print(f"  👀 Observando {folder} (polling a cada {poll_interval:g}s)")
+
+    done = {}  # caminho normalizado -> assinatura do arquivo quando foi entregue
+    pending = {}  # caminho -> (assinatura, instante em que ficou estável)
+
+    for path in _list_videos(folder):
+        signature = _signature(path)
+        if signature is None:
+            continue
+        size, mtime_ns = signature
+        if size > 0 and time.time_ns() - mtime_ns >= debounce * 1e9:
+            done[os.path.normcase(path)] = signature
+        else:
+            # Upload em andamento quando o observador subiu
+            pending[path] = (signature, time.monotonic())
+
+    try:
+        while True:
+            for path in source.wait(poll_interval):
+                if not _is_video(path) or path in pending:
+                    continue
+                signature = _signature(path)
+                # Já entregue e sem mudanças desde então
+                if signature is None or done.get(os.path.normcase(path)) == signature:
+                    continue
+                pending[path] = (signature, time.monotonic())
+
+            now = time.monotonic()
+            for path in list(pending):
+                signature, stable_since = pending[path]
+                current = _signature(path)
+
+                if current is None:
+                    # Arquivo sumiu (ex.: upload temporário renomeado)
+                    del pending[path]
+                elif current != signature or current[0] == 0:
+                    pending[path] = (current, now)
+                elif now - stable_since >= debounce:
+                    del pending[path]
+                    done[os.path.normcase(path)] = current
+                    on_video(path)
+    finally:
+        source.close()